@@ -0,0 +1,211 @@
+from functools import lru_cache
+
+import numpy as np
+
+# 与 noise 库 (_noise.h) 相同的 Perlin 置换表与梯度表
+_PERM_256 = np.array([
+    151, 160, 137, 91, 90, 15, 131, 13, 201, 95, 96, 53, 194, 233, 7, 225, 140,
+    36, 103, 30, 69, 142, 8, 99, 37, 240, 21, 10, 23, 190, 6, 148, 247, 120,
+    234, 75, 0, 26, 197, 62, 94, 252, 219, 203, 117, 35, 11, 32, 57, 177, 33,
+    88, 237, 149, 56, 87, 174, 20, 125, 136, 171, 168, 68, 175, 74, 165, 71,
+    134, 139, 48, 27, 166, 77, 146, 158, 231, 83, 111, 229, 122, 60, 211, 133,
+    230, 220, 105, 92, 41, 55, 46, 245, 40, 244, 102, 143, 54, 65, 25, 63, 161,
+    1, 216, 80, 73, 209, 76, 132, 187, 208, 89, 18, 169, 200, 196, 135, 130,
+    116, 188, 159, 86, 164, 100, 109, 198, 173, 186, 3, 64, 52, 217, 226, 250,
+    124, 123, 5, 202, 38, 147, 118, 126, 255, 82, 85, 212, 207, 206, 59, 227,
+    47, 16, 58, 17, 182, 189, 28, 42, 223, 183, 170, 213, 119, 248, 152, 2, 44,
+    154, 163, 70, 221, 153, 101, 155, 167, 43, 172, 9, 129, 22, 39, 253, 19, 98,
+    108, 110, 79, 113, 224, 232, 178, 185, 112, 104, 218, 246, 97, 228, 251, 34,
+    242, 193, 238, 210, 144, 12, 191, 179, 162, 241, 81, 51, 145, 235, 249, 14,
+    239, 107, 49, 192, 214, 31, 181, 199, 106, 157, 184, 84, 204, 176, 115, 121,
+    50, 45, 127, 4, 150, 254, 138, 236, 205, 93, 222, 114, 67, 29, 24, 72, 243,
+    141, 128, 195, 78, 66, 215, 61, 156, 180,
+], dtype=np.int32)
+PERM = np.concatenate([_PERM_256, _PERM_256])
+
+_GRAD3 = np.array([
+    [1, 1, 0], [-1, 1, 0], [1, -1, 0], [-1, -1, 0],
+    [1, 0, 1], [-1, 0, 1], [1, 0, -1], [-1, 0, -1],
+    [0, 1, 1], [0, -1, 1], [0, 1, -1], [0, -1, -1],
+    [1, 0, -1], [-1, 0, -1], [0, -1, 1], [0, 1, 1],
+], dtype=np.float32)
+GRAD_X, GRAD_Y, GRAD_Z = (np.ascontiguousarray(_GRAD3[:, axis]) for axis in range(3))
+
+
+@lru_cache(maxsize=64)
+def _get_perm(base):
+    """base 对应的置换表（512 项，前后两半相同）
+
+    base 为 0 时使用 noise 库的置换表（结果与 noise 库一致）；其他 base 使用由 base
+    决定的随机置换表。noise 库把 base 加到格点下标上，base > 0 时会越界读取，而把下标
+    循环取值又会让 base 与 base + 256 得到相同的噪声，因此每个 base 使用独立的置换表。
+    """
+    if base == 0:
+        return PERM
+    return np.tile(np.random.default_rng(base % (1 << 64)).permutation(256).astype(np.int32), 2)
+
+
+@lru_cache(maxsize=64)
+def _get_tables2(base):
+    """二维查找表 (置换表, 角点梯度 x, 角点梯度 y)：最内层的 perm[perm[k]] & 15 预先合并成按 k 直接查的表"""
+    perm = _get_perm(base)
+    corner_hash = perm[perm] & 15
+    return perm, GRAD_X[corner_hash], GRAD_Y[corner_hash]
+
+
+@lru_cache(maxsize=64)
+def _get_tables3(base):
+    """三维查找表 (置换表, 角点梯度 x, y, z)：最内层的 perm[k] & 15 → 梯度分量"""
+    perm = _get_perm(base)
+    corner_hash = perm & 15
+    return perm, GRAD_X[corner_hash], GRAD_Y[corner_hash], GRAD_Z[corner_hash]
+
+
+def _fade(t):
+    return t * t * t * (t * (t * 6 - 15) + 10)
+
+
+def _lerp(t, a, b):
+    return a + t * (b - a)
+
+
+def _corner_grad2(grad_x, grad_y, index, x, y):
+    """等价于 grad2(perm[perm[index]], x, y)"""
+    return x * np.take(grad_x, index) + y * np.take(grad_y, index)
+
+
+def _corner_grad3(grads, index, x, y, z):
+    """等价于 grad3(perm[index], x, y, z)，grads 为 (梯度 x, 梯度 y, 梯度 z) 查找表"""
+    grad_x, grad_y, grad_z = grads
+    return x * np.take(grad_x, index) + y * np.take(grad_y, index) + z * np.take(grad_z, index)
+
+
+def _noise2(x, y, repeatx, repeaty, base):
+    """单个八度的二维 Perlin 噪声，逐元素对应 noise 库的 noise2()"""
+    # 坐标相关的量保持输入形状（网格时为一维），只有哈希组合才展开成二维
+    i = np.floor(np.fmod(x, repeatx)).astype(np.int32)
+    j = np.floor(np.fmod(y, repeaty)).astype(np.int32)
+    ii = np.fmod((i + 1).astype(np.float32), repeatx).astype(np.int32)
+    jj = np.fmod((j + 1).astype(np.float32), repeaty).astype(np.int32)
+    # 下标都在 [0, 511) 内，不需要再循环取值
+    i &= 255
+    j &= 255
+    ii &= 255
+    jj &= 255
+
+    x = x - np.floor(x)
+    y = y - np.floor(y)
+    fx = _fade(x)
+    fy = _fade(y)
+
+    perm, grad_x, grad_y = _get_tables2(base)
+    a = np.take(perm, i)
+    b = np.take(perm, ii)
+
+    return _lerp(fy, _lerp(fx, _corner_grad2(grad_x, grad_y, a + j, x, y),
+                           _corner_grad2(grad_x, grad_y, b + j, x - 1, y)),
+                 _lerp(fx, _corner_grad2(grad_x, grad_y, a + jj, x, y - 1),
+                       _corner_grad2(grad_x, grad_y, b + jj, x - 1, y - 1)))
+
+
+def _noise3(x, y, z, repeatx, repeaty, repeatz, base):
+    """单个八度的三维 Perlin 噪声，逐元素对应 noise 库的 noise3()"""
+    i = np.floor(np.fmod(x, repeatx)).astype(np.int32)
+    j = np.floor(np.fmod(y, repeaty)).astype(np.int32)
+    k = np.floor(np.fmod(z, repeatz)).astype(np.int32)
+    ii = np.fmod((i + 1).astype(np.float32), repeatx).astype(np.int32)
+    jj = np.fmod((j + 1).astype(np.float32), repeaty).astype(np.int32)
+    kk = np.fmod((k + 1).astype(np.float32), repeatz).astype(np.int32)
+    # 下标都在 [0, 511) 内，不需要再循环取值
+    i &= 255
+    j &= 255
+    k &= 255
+    ii &= 255
+    jj &= 255
+    kk &= 255
+
+    x = x - np.floor(x)
+    y = y - np.floor(y)
+    z = z - np.floor(z)
+    fx = _fade(x)
+    fy = _fade(y)
+    fz = _fade(z)
+
+    perm, *grads = _get_tables3(base)
+    a = np.take(perm, i)
+    aa = np.take(perm, a + j)
+    ab = np.take(perm, a + jj)
+    b = np.take(perm, ii)
+    ba = np.take(perm, b + j)
+    bb = np.take(perm, b + jj)
+
+    return _lerp(fz, _lerp(fy, _lerp(fx, _corner_grad3(grads, aa + k, x, y, z),
+                                     _corner_grad3(grads, ba + k, x - 1, y, z)),
+                           _lerp(fx, _corner_grad3(grads, ab + k, x, y - 1, z),
+                                 _corner_grad3(grads, bb + k, x - 1, y - 1, z))),
+                 _lerp(fy, _lerp(fx, _corner_grad3(grads, aa + kk, x, y, z - 1),
+                                 _corner_grad3(grads, ba + kk, x - 1, y, z - 1)),
+                       _lerp(fx, _corner_grad3(grads, ab + kk, x, y - 1, z - 1),
+                             _corner_grad3(grads, bb + kk, x - 1, y - 1, z - 1))))
+
+
+def pnoise2(x, y, octaves=1, persistence=0.5, lacunarity=2.0,
+            repeatx=1024, repeaty=1024, base=0):
+    """数组版 noise.pnoise2：对整个坐标网格一次性求值
+
+    x、y 可以是任意可广播的数组，例如 (N, 1) 与 (1, M) 的网格坐标。
+    与 C 实现一样使用 float32 运算，base 为 0 时结果与 noise.pnoise2 逐位一致；
+    其他 base 使用各自的置换表（见 _get_perm），不同的 base 得到不同的噪声。
+    """
+    if octaves < 1:
+        raise ValueError("Expected octaves value > 0")
+    x = np.asarray(x, dtype=np.float32)
+    y = np.asarray(y, dtype=np.float32)
+
+    freq = np.float32(1.0)
+    amp = np.float32(1.0)
+    max_amp = np.float32(0.0)
+    total = np.zeros(np.broadcast_shapes(x.shape, y.shape), dtype=np.float32)
+    persistence = np.float32(persistence)
+    lacunarity = np.float32(lacunarity)
+
+    for _ in range(octaves):
+        total += _noise2(x * freq, y * freq,
+                         np.float32(repeatx) * freq, np.float32(repeaty) * freq, base) * amp
+        max_amp += amp
+        freq *= lacunarity
+        amp *= persistence
+
+    return total / max_amp
+
+
+def pnoise3(x, y, z, octaves=1, persistence=0.5, lacunarity=2.0,
+            repeatx=1024, repeaty=1024, repeatz=1024, base=0):
+    """数组版 noise.pnoise3：对任意形状的坐标数组一次性求值
+
+    与 C 实现一样使用 float32 运算，base 为 0 时结果与 noise.pnoise3 逐位一致；
+    其他 base 使用各自的置换表（见 _get_perm），不同的 base 得到不同的噪声。
+    """
+    if octaves < 1:
+        raise ValueError("Expected octaves value > 0")
+    x = np.asarray(x, dtype=np.float32)
+    y = np.asarray(y, dtype=np.float32)
+    z = np.asarray(z, dtype=np.float32)
+
+    freq = np.float32(1.0)
+    amp = np.float32(1.0)
+    max_amp = np.float32(0.0)
+    total = np.zeros(np.broadcast_shapes(x.shape, y.shape, z.shape), dtype=np.float32)
+    persistence = np.float32(persistence)
+    lacunarity = np.float32(lacunarity)
+
+    for _ in range(octaves):
+        # C 实现中三维的 repeat 是整数
+        total += _noise3(x * freq, y * freq, z * freq,
+                         np.float32(int(repeatx * freq)), np.float32(int(repeaty * freq)),
+                         np.float32(int(repeatz * freq)), base) * amp
+        max_amp += amp
+        freq *= lacunarity
+        amp *= persistence
+
+    return total / max_amp
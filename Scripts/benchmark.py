@@ -0,0 +1,256 @@
+"""无显示环境下的性能基准测试
+
+使用 SDL 的 dummy 视频驱动，对生成器和渲染器的热点路径计时：
+    - PlanetGenerator.generate（多个分辨率，网格与等面积采样）
+    - PlanetGenerator.load_or_generate（冷启动与缓存命中）
+    - Map2DGenerator.get_chunk（八种生物群系各自的区块生成）
+    - Map2DScene.draw（最小、初始、最大缩放级别）
+    - Visualizer.draw（两种绘制模式，旋转中与静止）
+
+用法:
+    python Scripts/benchmark.py                        # 运行并打印结果
+    python Scripts/benchmark.py -o results.json        # 结果写入 JSON
+    python Scripts/benchmark.py -b baseline.json       # 与基线比较，变慢超过阈值时返回非零退出码
+"""
+import os
+
+# 必须在导入 pygame 之前设置
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pygame
+
+from config import *
+import visualizer
+from planet_generator import PlanetGenerator
+from map_2d_generator import Map2DGenerator
+from map_2d_scene import Map2DScene
+
+BENCHMARK_SEED = 42
+PLANET_RESOLUTIONS = (50, 150, 300)
+PLANET_SAMPLINGS = ("grid", "equal_area")
+MAP_ZOOM_LEVELS = {
+    "min": MIN_TILES_ON_SCREEN,
+    "initial": INITIAL_TILES_ON_SCREEN,
+    "max": MAX_TILES_ON_SCREEN,
+}
+PLANET_RENDER_MODES = ("points", "raycast")
+
+# 与基线比较时，差值小于该毫秒数的变慢视为测量噪声
+MIN_REGRESSION_MS = 0.5
+
+
+def _quiet():
+    """屏蔽生成器和场景的控制台输出"""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def _time_samples(func, repeat, before=None):
+    """多次调用 func 计时（before 在每次计时前调用，不计入耗时），返回统计结果（毫秒）"""
+    samples = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "median_ms": statistics.median(samples),
+        "min_ms": min(samples),
+        "mean_ms": statistics.fmean(samples),
+        "runs": len(samples),
+    }
+
+
+def _generate_planet(resolution):
+    with _quiet():
+        planet = PlanetGenerator(resolution=resolution, seed=BENCHMARK_SEED)
+        planet.generate()
+    return planet
+
+
+def bench_planet_generation(results, quick):
+    """PlanetGenerator.generate 在多个分辨率下的耗时（两种采样方式）"""
+    for sampling in PLANET_SAMPLINGS:
+        prefix = "planet_generate" if sampling == "grid" else f"planet_generate/{sampling}"
+        for resolution in PLANET_RESOLUTIONS:
+            def generate():
+                with _quiet():
+                    PlanetGenerator(resolution=resolution, seed=BENCHMARK_SEED, sampling=sampling).generate()
+            results[f"{prefix}/res{resolution}"] = _time_samples(generate, 1 if quick else 3)
+
+
+def bench_planet_startup(results, quick):
+    """启动时获取行星数据的耗时：冷启动（生成并写入缓存）与缓存命中（内存映射加载）"""
+    repeat = 2 if quick else 5
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cold_dirs = iter(os.path.join(cache_dir, f"cold{i}") for i in range(repeat))
+        def cold_start():
+            with _quiet():
+                PlanetGenerator(resolution=RESOLUTION, seed=BENCHMARK_SEED).load_or_generate(next(cold_dirs))
+        results[f"planet_startup/cold/res{RESOLUTION}"] = _time_samples(cold_start, repeat)
+
+        warm_dir = os.path.join(cache_dir, "cold0")
+        def cached_start():
+            with _quiet():
+                PlanetGenerator(resolution=RESOLUTION, seed=BENCHMARK_SEED).load_or_generate(warm_dir)
+        results[f"planet_startup/cached/res{RESOLUTION}"] = _time_samples(cached_start, repeat * 4)
+
+
+def bench_chunk_generation(results, planet, quick):
+    """Map2DGenerator.get_chunk 对每种生物群系生成新区块的耗时"""
+    repeat = 2 if quick else 8
+    for biome in BIOME_KEYS:
+        # 整个行星设为同一生物群系，保证每个区块都走该生物群系的生成规则
+        biome_planet = PlanetGenerator(resolution=planet.resolution, seed=planet.seed)
+        biome_planet.points = planet.points
+        biome_planet.biomes = np.full_like(planet.biomes, BIOME_IDS[biome])
+        generator = Map2DGenerator(biome_planet, async_loading=False, chunk_store_dir=None)
+
+        chunk_coords = iter((chunk_x, 0) for chunk_x in range(repeat))
+        def get_new_chunk():
+            generator.get_chunk(*next(chunk_coords))
+        results[f"chunk_generate/{biome}"] = _time_samples(get_new_chunk, repeat)
+        generator.shutdown()
+
+
+def bench_map_draw(results, planet, quick):
+    """Map2DScene.draw 在不同缩放级别下的耗时（平移中与整帧重绘）"""
+    repeat = 10 if quick else 60
+    generator = Map2DGenerator(planet, async_loading=False, chunk_store_dir=None)
+    with _quiet():
+        scene = Map2DScene(generator)
+        scene.start_new_map("GRASSLAND", (planet.resolution // 2, planet.resolution // 2))
+
+    for zoom_name, tiles_on_screen in MAP_ZOOM_LEVELS.items():
+        scene.tiles_on_screen = tiles_on_screen
+        scene.camera_x = scene.camera_y = CHUNK_SIZE // 2
+        scene.draw()
+
+        # 在区块中心附近来回平移，不触发区块加载
+        step = [1]
+        def pan():
+            step[0] = -step[0]
+            scene.camera_x += step[0]
+        results[f"map_draw/pan/{zoom_name}"] = _time_samples(scene.draw, repeat, before=pan)
+
+        def invalidate():
+            scene.frame_dirty = True
+        results[f"map_draw/full/{zoom_name}"] = _time_samples(scene.draw, repeat, before=invalidate)
+
+    generator.shutdown()
+
+
+def bench_planet_draw(results, planet, quick):
+    """Visualizer.draw 在两种绘制模式下的耗时（旋转中与静止）"""
+    repeat = 10 if quick else 40
+    scene = visualizer.Visualizer(planet)
+    default_mode = visualizer.PLANET_RENDER_MODE
+    try:
+        for mode in PLANET_RENDER_MODES:
+            visualizer.PLANET_RENDER_MODE = mode
+            scene.draw()
+
+            def rotate():
+                scene.angle_y += ROTATION_SPEED
+            results[f"planet_draw/{mode}/rotating"] = _time_samples(scene.draw, repeat, before=rotate)
+            results[f"planet_draw/{mode}/idle"] = _time_samples(scene.draw, repeat)
+    finally:
+        visualizer.PLANET_RENDER_MODE = default_mode
+
+
+def run_benchmarks(quick=False):
+    """运行所有基准测试，返回 {名称: 统计结果}"""
+    pygame.init()
+    results = {}
+    bench_planet_generation(results, quick)
+    bench_planet_startup(results, quick)
+    planet = _generate_planet(RESOLUTION)
+    bench_chunk_generation(results, planet, quick)
+    bench_map_draw(results, planet, quick)
+    bench_planet_draw(results, planet, quick)
+    pygame.quit()
+    return results
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """与基线比较最短耗时（受后台负载干扰最小），返回变慢超过阈值的测试列表 [(名称, 基线, 当前)]"""
+    regressions = []
+    for name, baseline_stats in baseline.items():
+        stats = results.get(name)
+        if stats is None:
+            continue
+        baseline_ms = baseline_stats["min_ms"]
+        current_ms = stats["min_ms"]
+        if current_ms > baseline_ms * (1 + tolerance) and current_ms - baseline_ms > MIN_REGRESSION_MS:
+            regressions.append((name, baseline_ms, current_ms))
+    return regressions
+
+
+def _print_results(results, baseline=None):
+    width = max(len(name) for name in results)
+    for name, stats in results.items():
+        line = f"{name:<{width}}  {stats['median_ms']:9.2f} ms  (min {stats['min_ms']:.2f}, n={stats['runs']})"
+        if baseline and name in baseline:
+            ratio = stats["min_ms"] / baseline[name]["min_ms"] if baseline[name]["min_ms"] else float("inf")
+            line += f"  x{ratio:.2f} vs baseline"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生成器与渲染器的无显示性能基准测试")
+    parser.add_argument("-o", "--output", help="把结果写入 JSON 文件（可作为之后比较的基线）")
+    parser.add_argument("-b", "--baseline", help="与之比较的基线 JSON 文件")
+    parser.add_argument("-t", "--tolerance", type=float, default=0.2,
+                        help="允许的变慢比例，超过即视为性能回退（默认 0.2，即 20%%）")
+    parser.add_argument("--quick", action="store_true", help="减少重复次数，快速检查")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(quick=args.quick)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+    _print_results(results, baseline)
+
+    if args.output:
+        report = {
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "pygame": pygame.version.ver,
+                "platform": platform.platform(),
+                "quick": args.quick,
+            },
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(report, output_file, indent=2)
+        print(f"结果已写入 {args.output}")
+
+    if baseline is not None:
+        regressions = compare_with_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print(f"性能回退（超过 {args.tolerance:.0%}）:")
+            for name, baseline_ms, current_ms in regressions:
+                print(f"  {name}: {baseline_ms:.2f} ms -> {current_ms:.2f} ms")
+            return 1
+        print("未发现性能回退")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+from collections import OrderedDict
+
+
+def _chunk_nbytes(chunk_data):
+    """区块数据占用的字节数"""
+    return getattr(chunk_data, "nbytes", 0)
+
+
+class ChunkCache:
+    """有容量上限的区块缓存，按最近最少使用（LRU）顺序淘汰
+
+    max_entries / max_bytes 为 None 表示不限制该项。被固定（pin）的区块
+    （例如当前加载窗口内的区块）不会被淘汰，即使因此暂时超出预算。
+    """
+
+    def __init__(self, max_entries=None, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._chunks = OrderedDict()  # {(chunk_x, chunk_y): chunk_data}，末尾为最近使用
+        self._pinned = set()
+        self.total_bytes = 0
+
+        # 统计计数
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, chunk_key):
+        return chunk_key in self._chunks
+
+    def __len__(self):
+        return len(self._chunks)
+
+    def get(self, chunk_key):
+        """获取区块并标记为最近使用；不存在时返回 None"""
+        chunk_data = self._chunks.get(chunk_key)
+        if chunk_data is None:
+            self.misses += 1
+            return None
+        self._chunks.move_to_end(chunk_key)
+        self.hits += 1
+        return chunk_data
+
+    def put(self, chunk_key, chunk_data):
+        """存入区块，必要时淘汰最久未使用的区块"""
+        if chunk_key in self._chunks:
+            self.total_bytes -= _chunk_nbytes(self._chunks[chunk_key])
+        self._chunks[chunk_key] = chunk_data
+        self._chunks.move_to_end(chunk_key)
+        self.total_bytes += _chunk_nbytes(chunk_data)
+        self._evict()
+
+    def set_pinned(self, chunk_keys):
+        """设置需要常驻的区块（替换之前的固定集合）"""
+        self._pinned = set(chunk_keys)
+        self._evict()
+
+    def stats(self):
+        """返回缓存的统计信息"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._chunks),
+            "bytes": self.total_bytes,
+            "pinned": len(self._pinned),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _over_budget(self):
+        if self.max_entries is not None and len(self._chunks) > self.max_entries:
+            return True
+        if self.max_bytes is not None and self.total_bytes > self.max_bytes:
+            return True
+        return False
+
+    def _evict(self):
+        """从最久未使用的一端开始淘汰未固定的区块，直到满足预算"""
+        if not self._over_budget():
+            return
+        for chunk_key in list(self._chunks):
+            if not self._over_budget():
+                break
+            if chunk_key in self._pinned:
+                continue
+            self.total_bytes -= _chunk_nbytes(self._chunks.pop(chunk_key))
+            self.evictions += 1
@@ -0,0 +1,157 @@
+import os
+import queue
+import threading
+import numpy as np
+from config import *
+from disk_budget import prune_cache_keys
+
+# 每个区域文件包含 REGION_SIZE x REGION_SIZE 个区块
+REGION_SIZE = 16
+REGION_CHUNKS = REGION_SIZE * REGION_SIZE
+# 文件头：每个区块一个 int64 索引项
+#   0     -> 区块不存在
+#   > 0   -> 区块瓦片数据在文件中的偏移
+#   < 0   -> 单一瓦片类型的区块，值为 -(tile_type + 1)
+HEADER_BYTES = REGION_CHUNKS * 8
+
+
+class ChunkStore:
+    """持久化的区块存储：按区域文件分组，写入在后台线程进行
+
+    区块数据是 (seed, chunk_x, chunk_y) 的确定函数，store_key 应包含种子和生成器
+    版本，生成规则变化后旧的数据就不会再被读到。root_dir 下所有键的总大小超过
+    max_bytes 时，打开存储时按最近使用时间删除其他键的整个目录。
+    """
+
+    def __init__(self, root_dir, store_key, max_bytes=None):
+        self.directory = os.path.join(root_dir, store_key)
+        os.makedirs(self.directory, exist_ok=True)
+        removed = prune_cache_keys(root_dir, max_bytes, store_key)
+        if removed:
+            print(f"区块存储超出磁盘预算，已删除 {len(removed)} 个最久未使用的存储")
+
+        self._lock = threading.Lock()
+        self._region_indices = {}   # {(region_x, region_y): 文件头索引数组}
+        self._pending_writes = {}   # 等待写入磁盘的区块 {(chunk_x, chunk_y): chunk_data}
+        self.failed_writes = 0      # 写入失败（例如磁盘已满）而被丢弃的区块数
+        self._write_queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="ChunkStoreWriter", daemon=True)
+        self._writer.start()
+
+    def load(self, chunk_x, chunk_y):
+        """读取区块；存在时返回瓦片数组（或单一瓦片标量），否则返回 None
+
+        瓦片数据复制到内存中返回：每个内存映射都会占用一个文件描述符，
+        缓存中的区块一多就会超出进程的打开文件数限制。
+        """
+        chunk_key = (chunk_x, chunk_y)
+        region_key, slot = self._locate(chunk_x, chunk_y)
+        with self._lock:
+            if chunk_key in self._pending_writes:
+                return self._pending_writes[chunk_key]
+            entry = int(self._get_region_index(region_key)[slot])
+
+        if entry == 0:
+            return None
+        if entry < 0:
+            return np.uint8(-entry - 1)
+        tiles = np.fromfile(self._region_path(region_key), dtype=np.uint8,
+                            count=CHUNK_SIZE * CHUNK_SIZE, offset=entry)
+        return tiles.reshape(CHUNK_SIZE, CHUNK_SIZE)
+
+    def save(self, chunk_x, chunk_y, chunk_data):
+        """提交区块到后台线程写入磁盘（不阻塞调用方）"""
+        chunk_key = (chunk_x, chunk_y)
+        with self._lock:
+            self._pending_writes[chunk_key] = chunk_data
+        self._write_queue.put((chunk_key, chunk_data))
+
+    def close(self):
+        """等待所有写入完成并停止后台线程"""
+        if self._writer.is_alive():
+            self._write_queue.put(None)
+            self._writer.join()
+
+    def _locate(self, chunk_x, chunk_y):
+        """区块所在的区域坐标及其在区域内的槽位"""
+        region_key = (chunk_x // REGION_SIZE, chunk_y // REGION_SIZE)
+        slot = (chunk_x % REGION_SIZE) * REGION_SIZE + (chunk_y % REGION_SIZE)
+        return region_key, slot
+
+    def _region_path(self, region_key):
+        return os.path.join(self.directory, f"r.{region_key[0]}.{region_key[1]}.bin")
+
+    def _get_region_index(self, region_key):
+        """获取区域文件头索引（首次访问时从磁盘读取），调用方需持有锁"""
+        index = self._region_indices.get(region_key)
+        if index is None:
+            path = self._region_path(region_key)
+            if os.path.exists(path) and os.path.getsize(path) >= HEADER_BYTES:
+                index = np.fromfile(path, dtype="<i8", count=REGION_CHUNKS)
+            else:
+                index = np.zeros(REGION_CHUNKS, dtype="<i8")
+            self._region_indices[region_key] = index
+        return index
+
+    def _write_loop(self):
+        """后台写入线程"""
+        region_files = {}
+        try:
+            while True:
+                item = self._write_queue.get()
+                if item is None:
+                    break
+                chunk_key, chunk_data = item
+                try:
+                    self._write_chunk(region_files, chunk_key, chunk_data)
+                except Exception as error:
+                    self._discard_failed_write(region_files, chunk_key, chunk_data, error)
+        finally:
+            for region_file in region_files.values():
+                region_file.close()
+
+    def _write_chunk(self, region_files, chunk_key, chunk_data):
+        """将区块追加到区域文件，再更新文件头索引"""
+        region_key, slot = self._locate(*chunk_key)
+        region_file = region_files.get(region_key)
+        if region_file is None:
+            path = self._region_path(region_key)
+            if not os.path.exists(path):
+                with open(path, "wb") as new_file:
+                    new_file.write(bytes(HEADER_BYTES))
+            region_file = region_files[region_key] = open(path, "r+b")
+
+        if np.ndim(chunk_data) == 0:
+            entry = -(int(chunk_data) + 1)
+        else:
+            # 先写数据再写索引，中途退出也不会留下指向无效数据的索引
+            region_file.seek(0, os.SEEK_END)
+            entry = region_file.tell()
+            region_file.write(np.ascontiguousarray(chunk_data, dtype=np.uint8).tobytes())
+            region_file.flush()
+        region_file.seek(slot * 8)
+        region_file.write(np.int64(entry).astype("<i8").tobytes())
+        region_file.flush()
+
+        with self._lock:
+            self._get_region_index(region_key)[slot] = entry
+            if self._pending_writes.get(chunk_key) is chunk_data:
+                del self._pending_writes[chunk_key]
+
+    def _discard_failed_write(self, region_files, chunk_key, chunk_data, error):
+        """写入失败时丢弃该区块（之后按需重新生成），不让待写入的区块一直占用内存"""
+        region_file = region_files.pop(self._locate(*chunk_key)[0], None)
+        if region_file is not None:
+            # 出错后文件位置不确定，下次写入时重新打开
+            try:
+                region_file.close()
+            except OSError:
+                pass
+        with self._lock:
+            if self._pending_writes.get(chunk_key) is chunk_data:
+                del self._pending_writes[chunk_key]
+            self.failed_writes += 1
+            first_failure = self.failed_writes == 1
+        if first_failure:
+            print(f"区块 ({chunk_key[0]}, {chunk_key[1]}) 写入 {self.directory} 失败: {error!r}"
+                  f"（之后的写入失败只计入 failed_writes）")
@@ -1,8 +1,14 @@
+import os
 import random
 
 # 窗口设置
 SCREEN_WIDTH, SCREEN_HEIGHT = 1280, 720
 ROTATION_SPEED = 0.01
+PLANET_BACKGROUND_COLOR = (10, 10, 20)
+VECTORIZED_PLANET_RENDERING = True  # 球面场景批量计算光照与投影，并整体写入像素缓冲区（False 时逐点画圆）
+PLANET_RENDER_MODE = "points"  # "points"：每个经纬点画一个圆；"raycast"：逐像素反求球面坐标并采样生物群系纹理
+SHADE_LEVELS = 256             # 光线投射模式下预先计算的亮度级别数
+PLANET_LOD_MIN_POINT_SPACING = 8  # 点模式下相邻点的最小屏幕间距（像素），更密的高分辨率行星按步长降采样
 
 # 行星生成设置
 RESOLUTION = 150
@@ -11,6 +17,14 @@ SCALE = 2.0
 OCTAVES = 6
 PERSISTENCE = 0.5
 LACUNARITY = 2.0
+VECTORIZED_PLANET_GENERATION = True  # 按整网格批量计算球面点、噪声和生物群系（False 时逐点计算，与旧版本的地图一致）
+# "grid"：每个经纬度瓦片一个采样点；"equal_area"：每条纬线的采样点数与其周长成正比，两极不再重复采样
+# （"equal_area" 需要 VECTORIZED_PLANET_GENERATION = True）
+PLANET_SAMPLING = "grid"
+# 行星数据缓存目录（按生成参数的哈希分组），设为 None 关闭
+PLANET_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "cache", "planets")
+# 行星缓存的磁盘预算（字节）：超出后按最近使用时间删除其他行星的缓存（None 表示不限制）
+PLANET_CACHE_MAX_BYTES = 64 * 1024 * 1024
 
 # 生物群系颜色定义
 BIOME_COLORS = {
@@ -36,6 +50,10 @@ BIOME_NAMES = {
     "MOUNTAIN": "Mountain",
 }
 
+# 生物群系编号：按 BIOME_COLORS 的定义顺序，行星上以 uint8 编号存储
+BIOME_KEYS = list(BIOME_COLORS)
+BIOME_IDS = {biome: index for index, biome in enumerate(BIOME_KEYS)}
+
 # 场景管理设置
 SCENE_A = "scene_a"  # 球面地图场景
 SCENE_B = "scene_b"  # 2D地图场景
@@ -54,6 +72,7 @@ BUTTON_DISABLED_COLOR = (100, 100, 100)
 CHUNK_SIZE = 256  # 每个区块包含256x256个瓦片
 TILE_SIZE = 16    # 每个瓦片的像素大小
 CHUNK_PIXEL_SIZE = CHUNK_SIZE * TILE_SIZE
+VECTORIZED_CHUNK_GENERATION = True  # 按整块数组计算噪声和地形分类（False 时逐瓦片计算，与旧版本的地图一致）
 
 # 2D地图瓦片类型
 TILE_TYPES = {
@@ -71,11 +90,43 @@ CAMERA_SPEED = 5.0
 # 缩放设置：基于屏幕空间瓦片数量
 INITIAL_TILES_ON_SCREEN = 100  # 初始显示100x100个瓦片
 MIN_TILES_ON_SCREEN = 50       # 最小显示50x50个瓦片
-MAX_TILES_ON_SCREEN = 150      # 最大显示150x150个瓦片
+MAX_TILES_ON_SCREEN = 1024     # 最大显示1024x1024个瓦片（远景使用 LOD 金字塔绘制）
 ZOOM_SPEED = 0.1
+LOD_MIN_TILE_PIXELS = 2        # 瓦片小于该像素数时改用降采样的 LOD 级别绘制
+
+# 2D地图渲染设置
+VIEWPORT_COMPOSITOR = True     # 每帧只合成可见瓦片到一张屏幕缓冲区（False 时逐区块绘制预渲染表面）
+MAP_BACKGROUND_COLOR = (50, 50, 50)  # 未加载区域的背景色
+SCROLL_FRAME_REUSE = True      # 平移时复用上一帧，只合成新露出的边缘条带
+SCROLL_REDRAW_FRACTION = 0.5   # 单帧位移超过屏幕的该比例时整帧重绘
 
 # 区块加载设置
 LOAD_RADIUS = 2  # 加载半径：当前区块周围2个区块范围内的区块都会被加载
+PREFETCH_LOOKAHEAD_FRAMES = 60  # 预取时按当前速度预测的帧数，提前请求即将进入窗口的区块
+ASYNC_CHUNK_LOADING = True  # 是否在后台进程池中生成区块（未就绪的区块先显示占位色）
+CHUNK_WORKERS = max(1, (os.cpu_count() or 2) - 1)  # 后台生成区块的进程数
+CHUNK_CACHE_MAX_ENTRIES = None           # 区块缓存最多保留的区块数（None 表示不限制）
+CHUNK_CACHE_MAX_BYTES = 128 * 1024 * 1024  # 区块缓存的内存预算（字节），超出后按 LRU 淘汰
+# 区块持久化存储目录（按种子和生成器版本分组的区域文件），设为 None 关闭
+CHUNK_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "cache", "chunks")
+# 区块存储的磁盘预算（字节）：启动时超出预算则按最近使用时间删除其他种子的整个存储（None 表示不限制）
+CHUNK_STORE_MAX_BYTES = 1024 * 1024 * 1024
+# 世界导出工具（world_exporter.py）输出瓦片金字塔的默认目录
+WORLD_EXPORT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "cache", "tiles")
 
 # 调试设置
-SHOW_CHUNK_BORDERS = True  # 是否显示区块边界（红色实线）
\ No newline at end of file
+SHOW_CHUNK_BORDERS = True  # 是否显示区块边界（红色实线）
+
+# 帧计时设置
+PROFILER_ENABLED = True        # 逐帧记录各阶段耗时
+PROFILER_OVERLAY = False       # 是否显示阶段耗时叠加层（F3 切换）
+PROFILER_WINDOW_FRAMES = 300   # 滚动百分位统计使用的最近帧数
+PROFILER_HISTORY_FRAMES = 3600  # 导出 CSV 时保留的最近帧数（60 FPS 下约 1 分钟，预先分配的环形缓冲区）
+# F4 导出 CSV 的目录
+PROFILER_EXPORT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "cache", "profiles")
+
+# 帧调度设置
+SIMULATION_TICK_RATE = 60      # 每秒处理事件和输入的次数（摄像机和旋转速度按每次更新计算）
+RENDER_FPS = 60                # 渲染帧率上限；低于更新频率时多次更新合并为一次渲染
+IDLE_THROTTLING = True         # 画面没有变化时跳过渲染，并阻塞等待事件或后台任务完成
+IDLE_WAKE_INTERVAL_MS = 1000   # 空闲时最长的阻塞时间（毫秒）
\ No newline at end of file
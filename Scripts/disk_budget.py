@@ -0,0 +1,51 @@
+import os
+import shutil
+
+
+def get_directory_size(path):
+    """目录下所有文件的总字节数"""
+    total = 0
+    for directory, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(directory, name))
+            except OSError:
+                pass
+    return total
+
+
+def prune_cache_keys(root_dir, max_bytes, keep_key):
+    """按最近使用时间淘汰 root_dir 下的整个键目录，直到总大小不超过 max_bytes
+
+    每个键目录（例如一个种子的区块存储）要么整个保留要么整个删除；keep_key 是当前
+    正在使用的键，不会被删除，并刷新其使用时间。max_bytes 为 None 时不限制。
+    返回被删除的键列表。
+    """
+    keep_path = os.path.join(root_dir, keep_key)
+    if os.path.isdir(keep_path):
+        os.utime(keep_path)
+    if max_bytes is None or not os.path.isdir(root_dir):
+        return []
+
+    entries = []  # [(最近使用时间, 键, 字节数)]
+    total = 0
+    for entry in os.scandir(root_dir):
+        if not entry.is_dir(follow_symlinks=False):
+            continue
+        size = get_directory_size(entry.path)
+        total += size
+        if entry.name != keep_key:
+            entries.append((entry.stat().st_mtime, entry.name, size))
+
+    removed = []
+    for _, key, size in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            shutil.rmtree(os.path.join(root_dir, key))
+        except OSError as error:
+            print(f"无法删除缓存目录 {os.path.join(root_dir, key)}: {error}")
+            continue
+        total -= size
+        removed.append(key)
+    return removed
@@ -0,0 +1,151 @@
+import csv
+import os
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pygame
+from config import *
+
+
+class FrameProfiler:
+    """逐帧分阶段计时：滚动百分位统计、屏幕叠加显示和 CSV 导出
+
+    阶段可以嵌套，子阶段的名称为 "父阶段/子阶段"。同一帧内同名阶段的耗时累加。
+    """
+
+    def __init__(self, window=PROFILER_WINDOW_FRAMES, history=PROFILER_HISTORY_FRAMES, enabled=PROFILER_ENABLED):
+        self.enabled = enabled
+        self.show_overlay = PROFILER_OVERLAY
+        self._window = min(window, history)
+        # 预先分配的环形缓冲区：每帧一行、每个阶段一列 (ms)，该帧没有的阶段为 NaN
+        self._columns = {}                     # {阶段名: 列号}
+        self._history = np.full((history, 0), np.nan)
+        self._current = None                   # 当前帧各阶段的累计耗时
+        self._stack = []                       # 正在计时的阶段（支持嵌套）
+        self._frame_start = None
+        self.frame_count = 0
+
+    def begin_frame(self):
+        """开始一帧的计时"""
+        if not self.enabled:
+            return
+        self._current = {}
+        self._stack = []
+        self._frame_start = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name):
+        """对一个阶段计时（with profiler.phase("draw"): ...）"""
+        if not self.enabled or self._current is None:
+            yield
+            return
+        self._stack.append(name)
+        full_name = "/".join(self._stack)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self._stack.pop()
+            self._current[full_name] = self._current.get(full_name, 0.0) + elapsed
+
+    def end_frame(self):
+        """结束一帧的计时，把各阶段耗时写入环形缓冲区"""
+        if not self.enabled or self._current is None:
+            return
+        self._current["frame"] = (time.perf_counter() - self._frame_start) * 1000
+        new_names = [name for name in self._current if name not in self._columns]
+        if new_names:
+            # 出现新阶段时追加列（只在最初几帧发生）
+            for name in new_names:
+                self._columns[name] = len(self._columns)
+            padding = np.full((len(self._history), len(new_names)), np.nan)
+            self._history = np.hstack([self._history, padding])
+
+        row = self._history[self.frame_count % len(self._history)]
+        row[:] = np.nan
+        for name, elapsed in self._current.items():
+            row[self._columns[name]] = elapsed
+        self.frame_count += 1
+        self._current = None
+
+    def _recent_rows(self, count):
+        """最近 count 帧（不超过已记录的帧数）在环形缓冲区中的行号，按时间先后排列"""
+        count = min(count, self.frame_count, len(self._history))
+        return np.arange(self.frame_count - count, self.frame_count) % len(self._history)
+
+    def percentiles(self, name):
+        """阶段在最近若干帧内的 (p50, p95, p99) 耗时 (ms)，没有数据时返回 None"""
+        column = self._columns.get(name)
+        if column is None:
+            return None
+        samples = self._history[self._recent_rows(self._window), column]
+        samples = samples[~np.isnan(samples)]
+        if not len(samples):
+            return None
+        return tuple(np.percentile(samples, (50, 95, 99)))
+
+    def summary(self):
+        """最近若干帧内出现过的阶段的百分位统计 [(阶段名, p50, p95, p99)]，按阶段名排序（子阶段紧跟父阶段）"""
+        rows = []
+        for name in sorted(self._columns):
+            stats = self.percentiles(name)
+            if stats is not None:
+                rows.append((name,) + stats)
+        return rows
+
+    def export_csv(self, path):
+        """把历史记录导出为 CSV：每帧一行，每个阶段一列（该帧没有的阶段记为 0）"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        rows = self._recent_rows(len(self._history))
+        history = self._history[rows]
+        phase_names = sorted(name for name, column in self._columns.items()
+                             if not np.isnan(history[:, column]).all())
+        columns = [self._columns[name] for name in phase_names]
+        first_frame = self.frame_count - len(rows)
+        with open(path, "w", newline="", encoding="utf-8") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(["frame"] + [f"{name}_ms" for name in phase_names])
+            for offset, values in enumerate(np.nan_to_num(history[:, columns], nan=0.0)):
+                writer.writerow([first_frame + offset] + [f"{value:.3f}" for value in values])
+        return len(rows)
+
+    def draw_overlay(self, screen, font, footer=None):
+        """在屏幕右侧绘制各阶段的 p50/p95/p99 耗时 (ms)，footer 为表格下方附加的一行文字"""
+        if not self.enabled or not self.show_overlay:
+            return
+        rows = [("phase", "p50", "p95", "p99")]
+        for name, p50, p95, p99 in self.summary():
+            # 子阶段按层级缩进，只显示最后一级名称
+            label = "  " * name.count("/") + name.rsplit("/", 1)[-1]
+            rows.append((label, f"{p50:.2f}", f"{p95:.2f}", f"{p99:.2f}"))
+
+        # 名称列左对齐，数值列右对齐
+        line_height = font.get_linesize()
+        label_width = max(font.size(row[0])[0] for row in rows)
+        value_width = max(font.size(value)[0] for row in rows for value in row[1:]) + 12
+        width = 20 + label_width + 3 * value_width
+        height = 20 + line_height * len(rows)
+        footer_surface = None
+        if footer:
+            footer_surface = font.render(footer, True, (180, 180, 180))
+            width = max(width, 20 + footer_surface.get_width())
+            height += line_height
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        for i, row in enumerate(rows):
+            y = 10 + i * line_height
+            panel.blit(font.render(row[0], True, (220, 220, 220)), (10, y))
+            for j, value in enumerate(row[1:]):
+                text = font.render(value, True, (220, 220, 220))
+                panel.blit(text, (10 + label_width + (j + 1) * value_width - text.get_width(), y))
+        if footer_surface is not None:
+            panel.blit(footer_surface, (10, 10 + len(rows) * line_height))
+        screen.blit(panel, (SCREEN_WIDTH - width - 20, 80))
+
+
+# 全局共享的帧计时器，各场景在自己的子阶段中使用
+profiler = FrameProfiler()
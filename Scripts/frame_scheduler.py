@@ -0,0 +1,70 @@
+import time
+
+import pygame
+from config import *
+
+
+class FrameScheduler:
+    """主循环的帧调度：按固定频率处理事件和输入，只在画面变化时渲染，空闲时阻塞等待事件
+
+    调用顺序（每次循环）：get_events -> 处理事件和输入 -> should_render -> 渲染（可选）。
+    上一次循环画面没有任何变化时，get_events 阻塞到下一个事件（或 IDLE_WAKE_INTERVAL_MS 超时），
+    后台任务完成时由 post_wake_event 投递的事件唤醒。
+    """
+
+    def __init__(self, tick_rate=SIMULATION_TICK_RATE, render_fps=RENDER_FPS, idle_throttling=IDLE_THROTTLING):
+        self.tick_rate = tick_rate
+        self.idle_throttling = idle_throttling
+        # 渲染间隔减去半个更新周期，避免计时抖动让本该渲染的帧被跳过
+        self._render_interval = max(0.0, 1.0 / render_fps - 0.5 / tick_rate) if render_fps else 0.0
+        self._last_render = None
+        self._idle = False
+        self.rendered_frames = 0  # 实际渲染的帧数
+        self.skipped_frames = 0   # 处理了输入但没有渲染的帧数
+        self.idle_waits = 0       # 阻塞等待事件的次数
+
+    def get_events(self):
+        """取出待处理的事件；空闲时先阻塞等待"""
+        if not (self.idle_throttling and self._idle):
+            return pygame.event.get()
+        self.idle_waits += 1
+        event = pygame.event.wait(IDLE_WAKE_INTERVAL_MS)
+        events = [] if event.type == pygame.NOEVENT else [event]
+        return events + pygame.event.get()
+
+    def should_render(self, changed):
+        """本帧是否渲染：画面有变化且距上次渲染已达到渲染间隔"""
+        if self.idle_throttling and not changed:
+            self._idle = True
+            self.skipped_frames += 1
+            return False
+        self._idle = False
+        now = time.perf_counter()
+        if self._last_render is not None and now - self._last_render < self._render_interval:
+            # 变化保留到下一帧再渲染（多次更新合并为一次渲染）
+            self.skipped_frames += 1
+            return False
+        self._last_render = now
+        self.rendered_frames += 1
+        return True
+
+    def summary(self):
+        """渲染/跳过的帧数和空闲等待次数（显示在帧计时叠加层底部）"""
+        total = self.rendered_frames + self.skipped_frames
+        skipped_ratio = self.skipped_frames / total if total else 0.0
+        return (f"rendered {self.rendered_frames}, skipped {self.skipped_frames} ({skipped_ratio:.0%}), "
+                f"idle waits {self.idle_waits}")
+
+
+# 后台任务完成时投递的唤醒事件（主循环收到后重新检查画面是否需要更新）
+WAKE_EVENT = pygame.event.custom_type()
+
+
+def post_wake_event(*_):
+    """唤醒阻塞在 get_events 中的主循环；可以在任意线程中调用（例如 future 的完成回调）"""
+    try:
+        if pygame.get_init():
+            pygame.event.post(pygame.event.Event(WAKE_EVENT))
+    except pygame.error:
+        # 退出过程中显示系统已关闭，无需唤醒
+        pass
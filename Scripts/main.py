@@ -9,30 +9,43 @@ def main():
 
     # 生成行星蓝图数据
     planet_blueprint = PlanetGenerator(resolution=RESOLUTION, seed=SEED)
-    planet_blueprint.generate()
+    planet_blueprint.load_or_generate()
     
     # 创建场景管理器
     scene_manager = SceneManager(planet=planet_blueprint)
     
-    # 主游戏循环
+    # 主游戏循环：事件和输入按固定频率处理，画面只在变化时渲染
+    profiler = scene_manager.profiler
+    scheduler = scene_manager.scheduler
     running = True
     while running:
+        # 空闲时在这里阻塞等待事件（不计入帧计时）
+        events = scheduler.get_events()
+        profiler.begin_frame()
+        
         # 事件处理
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            else:
-                # 将其他事件传递给场景管理器处理
-                scene_manager.handle_event(event)
+        with profiler.phase("events"):
+            for event in events:
+                if event.type == pygame.QUIT:
+                    running = False
+                else:
+                    # 将其他事件传递给场景管理器处理
+                    scene_manager.handle_event(event)
         
         # 处理输入
-        scene_manager.handle_input()
+        with profiler.phase("input"):
+            scene_manager.handle_input()
+        
+        # 绘制画面（没有变化或未到渲染间隔时跳过）
+        if scheduler.should_render(scene_manager.needs_redraw()):
+            scene_manager.draw()
         
-        # 绘制画面
-        scene_manager.draw()
+        # 控制更新频率
+        with profiler.phase("tick"):
+            scene_manager.clock.tick(scheduler.tick_rate)
         
-        # 控制帧率
-        scene_manager.clock.tick(60)
+        profiler.end_frame()
+    scene_manager.shutdown()
     pygame.quit()
 
 if __name__ == "__main__":
@@ -1,60 +1,309 @@
 import numpy as np
 import noise
 import random
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import array_noise
+from chunk_cache import ChunkCache
+from chunk_store import ChunkStore
 from config import *
 
+# 区块生成器版本：修改地形生成规则后递增，使持久化存储中的旧区块失效
+CHUNK_GENERATOR_VERSION = 2
+
+def compact_chunk(chunk_data):
+    """压缩区块存储：瓦片类型用 uint8 保存，整块只有一种瓦片时只保存一个标量"""
+    chunk_data = np.asarray(chunk_data, dtype=np.uint8)
+    if chunk_data.ndim == 0 or (chunk_data == chunk_data.flat[0]).all():
+        return np.uint8(chunk_data.flat[0])
+    return chunk_data
+
+def is_uniform_chunk(chunk_data):
+    """区块是否为单一瓦片类型的标量形式"""
+    return np.ndim(chunk_data) == 0
+
+def expand_chunk(chunk_data):
+    """将区块展开为 (CHUNK_SIZE, CHUNK_SIZE) 的 uint8 数组（标量形式会被填满）"""
+    if is_uniform_chunk(chunk_data):
+        return np.full((CHUNK_SIZE, CHUNK_SIZE), chunk_data, dtype=np.uint8)
+    return chunk_data
+
+def count_tile_types(tiles, type_count=len(TILE_TYPES)):
+    """每种瓦片类型的计数图 (type_count, W, H)：第 t 层在瓦片类型为 t 处为 1"""
+    return np.stack([tiles == tile_type for tile_type in range(type_count)]).astype(np.uint32)
+
+def sum_counts_2x2(counts):
+    """把计数图按 2x2 块求和，边长减半；逐级求和得到的即每个 2^k x 2^k 块内的精确计数"""
+    type_count, width, height = counts.shape
+    return counts.reshape(type_count, width // 2, 2, height // 2, 2).sum(axis=(2, 4), dtype=np.uint32)
+
+def downsample_tile_types(tiles, type_count=len(TILE_TYPES)):
+    """2x2 众数降采样：每个瓦片取 2x2 范围内出现最多的瓦片类型（次数相同时取编号小的）"""
+    return sum_counts_2x2(count_tile_types(tiles, type_count)).argmax(axis=0).astype(np.uint8)
+
+def build_chunk_lod(chunk_data):
+    """构建区块的 LOD 金字塔：第 k 级每个瓦片是原区块 2^k x 2^k 范围内出现最多的瓦片类型
+
+    返回 [CHUNK_SIZE, CHUNK_SIZE/2, ..., 1] 边长的 uint8 数组列表。
+    """
+    chunk_data = expand_chunk(chunk_data)
+    counts = count_tile_types(chunk_data)
+    levels = [np.asarray(chunk_data, dtype=np.uint8)]
+    while counts.shape[1] > 1:
+        counts = sum_counts_2x2(counts)
+        levels.append(counts.argmax(axis=0).astype(np.uint8))
+    return levels
+
+# 海洋和陆地生物群系（海滩两者都不算）
+OCEAN_BIOME_IDS = [BIOME_IDS[biome] for biome in ("OCEAN", "DEEP_OCEAN")]
+LAND_BIOME_IDS = [BIOME_IDS[biome] for biome in ("GRASSLAND", "FOREST", "DESERT", "SNOW", "MOUNTAIN")]
+# 行星范围外的邻居按该生物群系处理
+OUTSIDE_BIOME = "GRASSLAND"
+
+def build_neighbor_maps(biomes):
+    """对整个行星的生物群系网格做 8 邻域运算，返回 (has_ocean_neighbor, has_land_neighbor) 两张布尔图"""
+    padded = np.pad(np.asarray(biomes), 1, constant_values=BIOME_IDS[OUTSIDE_BIOME])
+    rows, cols = biomes.shape
+    neighbor_maps = []
+    for biome_ids in (OCEAN_BIOME_IDS, LAND_BIOME_IDS):
+        matches = np.isin(padded, biome_ids)
+        neighbor_map = np.zeros((rows, cols), dtype=bool)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                if dx or dy:
+                    neighbor_map |= matches[1 + dx:1 + dx + rows, 1 + dy:1 + dy + cols]
+        neighbor_maps.append(neighbor_map)
+    return tuple(neighbor_maps)
+
+# 后台工作进程内的生成器实例（由 _init_chunk_worker 创建）
+_worker_generator = None
+
+def _init_chunk_worker(planet, vectorized):
+    """工作进程初始化：每个进程持有一份自己的生成器"""
+    global _worker_generator
+    _worker_generator = Map2DGenerator(planet, vectorized=vectorized, async_loading=False,
+                                       chunk_store_dir=None)
+
+def _generate_chunk_in_worker(chunk_x, chunk_y):
+    """在工作进程中生成区块，并一并构建 LOD 金字塔，返回 (chunk_data, 第 1 级起的 LOD 列表或 None)"""
+    chunk_data = _worker_generator._generate_chunk(chunk_x, chunk_y)
+    if is_uniform_chunk(chunk_data):
+        return chunk_data, None
+    # 第 0 级就是区块本身，不重复传回
+    return chunk_data, build_chunk_lod(chunk_data)[1:]
+
 class Map2DGenerator:
-    def __init__(self, planet):
+    def __init__(self, planet, vectorized=VECTORIZED_CHUNK_GENERATION, async_loading=ASYNC_CHUNK_LOADING,
+                 chunk_store_dir=CHUNK_STORE_DIR):
         self.planet = planet
-        self.generated_chunks = {}  # 存储已生成的区块 {(chunk_x, chunk_y): chunk_data}
+        self.vectorized = vectorized  # 是否按整块数组生成地形（否则逐瓦片计算噪声）
+        self.async_loading = async_loading  # 是否在后台进程池中生成区块
+        # 存储已生成的区块 {(chunk_x, chunk_y): chunk_data}，超出预算时按 LRU 淘汰
+        self.generated_chunks = ChunkCache(max_entries=CHUNK_CACHE_MAX_ENTRIES,
+                                           max_bytes=CHUNK_CACHE_MAX_BYTES)
+        self.pending_chunks = {}  # 后台生成中的区块 {(chunk_x, chunk_y): future}
+        self.chunk_lods = {}  # 后台生成时一并构建、尚未被场景取走的 LOD 金字塔 {(chunk_x, chunk_y): levels}
+        self.chunk_ready_callback = None  # 后台区块完成时调用（用于唤醒空闲的主循环）
         self.global_seed = planet.seed  # 使用行星种子确保一致性
+        self._executor = None
+        
+        # 每个球面瓦片的邻域上下文，整个行星只计算一次
+        self.has_ocean_neighbor, self.has_land_neighbor = build_neighbor_maps(planet.biomes)
+        
+        # 磁盘上的持久化区块存储（chunk_store_dir 为 None 时不启用）
+        self.chunk_store = None
+        if chunk_store_dir is not None:
+            self.chunk_store = ChunkStore(chunk_store_dir, self._get_store_key(), CHUNK_STORE_MAX_BYTES)
     
     def get_chunk(self, chunk_x, chunk_y):
-        """获取指定坐标的区块，如果不存在则生成"""
+        """获取指定坐标的区块，如果不存在则生成（阻塞）"""
+        chunk_key = (chunk_x, chunk_y)
+        
+        chunk_data = self._get_cached_chunk(chunk_key)
+        if chunk_data is None:
+            if chunk_key in self.pending_chunks:
+                # 已在后台生成，等待结果即可
+                chunk_data = self._take_pending_chunk(chunk_key)
+            else:
+                # 生成新区块
+                chunk_data = self._generate_chunk(chunk_x, chunk_y)
+            self._add_generated_chunk(chunk_key, chunk_data)
+        
+        return chunk_data
+    
+    def generate_chunk(self, chunk_x, chunk_y):
+        """直接生成区块，不读写缓存和持久化存储（用于批量导出等一次性生成）"""
+        return self._generate_chunk(chunk_x, chunk_y)
+    
+    def request_chunk(self, chunk_x, chunk_y):
+        """非阻塞地请求区块：已生成则直接返回，否则提交到后台生成并返回 None"""
         chunk_key = (chunk_x, chunk_y)
         
-        if chunk_key not in self.generated_chunks:
-            # 生成新区块
-            self.generated_chunks[chunk_key] = self._generate_chunk(chunk_x, chunk_y)
+        if not self.async_loading:
+            return self.get_chunk(chunk_x, chunk_y)
+        chunk_data = self._get_cached_chunk(chunk_key)
+        if chunk_data is not None:
+            return chunk_data
         
-        return self.generated_chunks[chunk_key]
+        future = self.pending_chunks.get(chunk_key)
+        if future is None:
+            self._submit_chunk(chunk_key)
+        elif future.done():
+            # 之前提交（例如预先生成）的任务已完成，直接取用结果
+            chunk_data = self._take_pending_chunk(chunk_key)
+            self._add_generated_chunk(chunk_key, chunk_data)
+            return chunk_data
+        return None
+    
+    def collect_finished_chunks(self):
+        """收集后台已完成的区块，返回本次新到达的区块 {(chunk_x, chunk_y): chunk_data}"""
+        finished = {}
+        for chunk_key, future in [(key, future) for key, future in self.pending_chunks.items() if future.done()]:
+            if self.pending_chunks.get(chunk_key) is not future:
+                # 进程池重建时已重新提交，等新的任务完成
+                continue
+            finished[chunk_key] = self._take_pending_chunk(chunk_key)
+            self._add_generated_chunk(chunk_key, finished[chunk_key])
+        return finished
+    
+    def pin_chunks(self, chunk_keys):
+        """固定当前加载窗口内的区块，使其不会被缓存淘汰（窗口外未取走的 LOD 金字塔一并丢弃）"""
+        chunk_keys = set(chunk_keys)
+        self.generated_chunks.set_pinned(chunk_keys)
+        for chunk_key in self.chunk_lods.keys() - chunk_keys:
+            del self.chunk_lods[chunk_key]
+    
+    def take_chunk_lod(self, chunk_key, chunk_data):
+        """取出区块的 LOD 金字塔：后台生成的区块已在工作进程中构建，其余（缓存命中、同步生成）在这里构建"""
+        chunk_lod = self.chunk_lods.pop(chunk_key, None)
+        if chunk_lod is None:
+            chunk_lod = build_chunk_lod(chunk_data)
+        return chunk_lod
+    
+    def get_cache_stats(self):
+        """获取区块缓存的统计信息（命中/未命中/淘汰次数、占用字节等）"""
+        return self.generated_chunks.stats()
+    
+    def get_chunk_biome(self, chunk_x, chunk_y):
+        """获取区块对应球面瓦片的生物群系名称"""
+        planet_tile = self._chunk_to_planet_tile(chunk_x, chunk_y)
+        return self._get_planet_biome(planet_tile[0], planet_tile[1])
+    
+    def get_placeholder_color(self, chunk_x, chunk_y):
+        """区块尚未生成时的占位颜色：对应球面瓦片的生物群系颜色"""
+        return BIOME_COLORS[self.get_chunk_biome(chunk_x, chunk_y)]
+    
+    def shutdown(self):
+        """关闭后台进程池，丢弃尚未开始的任务，并等待持久化写入完成"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self.pending_chunks = {}
+        self.chunk_lods = {}
+        if self.chunk_store is not None:
+            self.chunk_store.close()
+    
+    def _get_store_key(self):
+        """持久化存储的键：种子、行星生物群系指纹以及生成器版本和模式"""
+        fingerprint = hashlib.sha1(self.planet.biomes.tobytes()).hexdigest()[:12]
+        mode = "array" if self.vectorized else "loop"
+        return f"seed{self.global_seed}_r{self.planet.resolution}_{fingerprint}_v{CHUNK_GENERATOR_VERSION}_{mode}"
+    
+    def _get_cached_chunk(self, chunk_key):
+        """先查内存缓存，再查磁盘存储；都没有时返回 None"""
+        chunk_data = self.generated_chunks.get(chunk_key)
+        if chunk_data is None and self.chunk_store is not None:
+            chunk_data = self.chunk_store.load(*chunk_key)
+            if chunk_data is not None:
+                self.generated_chunks.put(chunk_key, chunk_data)
+        return chunk_data
+    
+    def _add_generated_chunk(self, chunk_key, chunk_data):
+        """记录新生成的区块：放入内存缓存并提交到磁盘存储"""
+        self.generated_chunks.put(chunk_key, chunk_data)
+        if self.chunk_store is not None:
+            self.chunk_store.save(*chunk_key, chunk_data)
+    
+    def _submit_chunk(self, chunk_key):
+        """把区块提交到后台进程池，记录到 pending_chunks"""
+        try:
+            future = self._get_executor().submit(_generate_chunk_in_worker, *chunk_key)
+        except BrokenProcessPool:
+            # 进程池在上次收集结果之后才损坏：重建后重新提交（同时重新提交其他等待中的区块）
+            self._restart_executor()
+            future = self._get_executor().submit(_generate_chunk_in_worker, *chunk_key)
+        if self.chunk_ready_callback is not None:
+            # 回调在进程池的管理线程中执行，参数为 future
+            future.add_done_callback(self.chunk_ready_callback)
+        self.pending_chunks[chunk_key] = future
+    
+    def _take_pending_chunk(self, chunk_key):
+        """取出后台任务的结果（未完成时阻塞等待）；后台生成失败时改为在主进程中同步生成"""
+        future = self.pending_chunks.pop(chunk_key)
+        try:
+            chunk_data, chunk_lod = future.result()
+            if chunk_lod is not None:
+                self.chunk_lods[chunk_key] = [chunk_data] + chunk_lod
+            return chunk_data
+        except BrokenProcessPool:
+            print(f"区块 ({chunk_key[0]}, {chunk_key[1]}) 的后台进程池已损坏，重建进程池并同步生成该区块")
+            self._restart_executor()
+        except Exception as error:
+            print(f"后台生成区块 ({chunk_key[0]}, {chunk_key[1]}) 失败: {error!r}，改为同步生成")
+        return self._generate_chunk(*chunk_key)
+    
+    def _restart_executor(self):
+        """丢弃损坏的进程池（例如工作进程被系统杀死），其余等待中的区块提交到新的进程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        for chunk_key in list(self.pending_chunks):
+            del self.pending_chunks[chunk_key]
+            self._submit_chunk(chunk_key)
+    
+    def _get_executor(self):
+        """按需创建后台进程池（噪声计算是 CPU 密集型，用进程绕开 GIL）"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=CHUNK_WORKERS,
+                                                 initializer=_init_chunk_worker,
+                                                 initargs=(self.planet, self.vectorized))
+        return self._executor
     
     def _generate_chunk(self, chunk_x, chunk_y):
         """生成指定坐标的区块"""
         # 获取对应的球面瓦片坐标
-        planet_tile = self._chunk_to_planet_tile(chunk_x, chunk_y)
+        tile_x, tile_y = self._chunk_to_planet_tile(chunk_x, chunk_y)
         
-        # 获取主瓦片和邻近瓦片的生物群系信息
-        main_biome = self._get_planet_biome(planet_tile[0], planet_tile[1])
-        neighbor_biomes = self._get_neighbor_biomes(planet_tile[0], planet_tile[1])
-        
-        # 生成区块数据
-        chunk_data = np.zeros((CHUNK_SIZE, CHUNK_SIZE), dtype=int)
+        # 主瓦片的生物群系和预先计算的邻域上下文
+        main_biome = self.planet.get_biome(tile_x, tile_y)
+        has_ocean_neighbor = self.has_ocean_neighbor[tile_x, tile_y]
+        has_land_neighbor = self.has_land_neighbor[tile_x, tile_y]
         
         # 根据生物群系生成不同的地形
         if main_biome in ["DEEP_OCEAN", "OCEAN"]:
             # 海洋生物群系：生成较多水域
-            chunk_data = self._generate_ocean_chunk(chunk_x, chunk_y, main_biome, neighbor_biomes)
+            chunk_data = self._generate_ocean_chunk(chunk_x, chunk_y, main_biome, has_land_neighbor)
         elif main_biome == "BEACH":
             # 海滩生物群系：生成沙滩和少量水域
-            chunk_data = self._generate_beach_chunk(chunk_x, chunk_y, neighbor_biomes)
+            chunk_data = self._generate_beach_chunk(chunk_x, chunk_y)
         elif main_biome == "DESERT":
             # 沙漠生物群系：生成沙漠地形
-            chunk_data = self._generate_desert_chunk(chunk_x, chunk_y, neighbor_biomes)
+            chunk_data = self._generate_desert_chunk(chunk_x, chunk_y, has_ocean_neighbor)
         elif main_biome == "SNOW":
             # 雪地生物群系：生成雪地地形
-            chunk_data = self._generate_snow_chunk(chunk_x, chunk_y, neighbor_biomes)
+            chunk_data = self._generate_snow_chunk(chunk_x, chunk_y, has_ocean_neighbor)
         elif main_biome == "MOUNTAIN":
             # 山地生物群系：生成山地地形
-            chunk_data = self._generate_mountain_chunk(chunk_x, chunk_y, neighbor_biomes)
+            chunk_data = self._generate_mountain_chunk(chunk_x, chunk_y, has_ocean_neighbor)
         elif main_biome == "FOREST":
             # 森林生物群系：生成森林地形
-            chunk_data = self._generate_forest_chunk(chunk_x, chunk_y, neighbor_biomes)
+            chunk_data = self._generate_forest_chunk(chunk_x, chunk_y, has_ocean_neighbor)
         else:  # GRASSLAND
             # 草原生物群系：生成草地地形
-            chunk_data = self._generate_grassland_chunk(chunk_x, chunk_y, neighbor_biomes)
+            chunk_data = self._generate_grassland_chunk(chunk_x, chunk_y, has_ocean_neighbor)
         
-        return chunk_data
+        return compact_chunk(chunk_data)
     
     def _chunk_to_planet_tile(self, chunk_x, chunk_y):
         """将区块坐标转换为球面瓦片坐标"""
@@ -72,27 +321,7 @@ class Map2DGenerator:
     def _get_planet_biome(self, tile_x, tile_y):
         """获取球面瓦片的生物群系"""
         if 0 <= tile_x < self.planet.resolution and 0 <= tile_y < self.planet.resolution:
-            color = self.planet.colors[tile_x, tile_y]
-            return self._color_to_biome(color)
-        return "GRASSLAND"
-    
-    def _get_neighbor_biomes(self, tile_x, tile_y):
-        """获取邻近瓦片的生物群系"""
-        neighbors = {}
-        directions = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
-        
-        for dx, dy in directions:
-            nx, ny = tile_x + dx, tile_y + dy
-            biome = self._get_planet_biome(nx, ny)
-            neighbors[(dx, dy)] = biome
-        
-        return neighbors
-    
-    def _color_to_biome(self, color):
-        """将颜色转换为生物群系名称"""
-        for biome, biome_color in BIOME_COLORS.items():
-            if np.array_equal(color, biome_color):
-                return biome
+            return self.planet.get_biome(tile_x, tile_y)
         return "GRASSLAND"
     
     def _get_continuous_noise(self, global_x, global_y, scale, octaves=2, seed_offset=0):
@@ -100,190 +329,123 @@ class Map2DGenerator:
         return noise.pnoise2(global_x * scale, global_y * scale, 
                            octaves=octaves, base=self.global_seed + seed_offset)
     
-    def _generate_ocean_chunk(self, chunk_x, chunk_y, main_biome, neighbor_biomes):
-        """生成海洋区块"""
-        chunk = np.zeros((CHUNK_SIZE, CHUNK_SIZE), dtype=int)
-        
-        # 检查是否有陆地邻居，如果有则减少水域比例
-        has_land_neighbor = any(biome in ["GRASSLAND", "FOREST", "DESERT", "SNOW", "MOUNTAIN"] for biome in neighbor_biomes.values())
+    def _get_chunk_noise(self, chunk_x, chunk_y, scale, octaves=2, seed_offset=0):
+        """获取整个区块的噪声场，返回 (CHUNK_SIZE, CHUNK_SIZE) 数组，下标为 [x, y]"""
+        if self.vectorized:
+            # 整块模式：在区块的全局坐标网格上一次性求值
+            global_x = (chunk_x * CHUNK_SIZE + np.arange(CHUNK_SIZE))[:, None]
+            global_y = (chunk_y * CHUNK_SIZE + np.arange(CHUNK_SIZE))[None, :]
+            return array_noise.pnoise2(global_x * scale, global_y * scale,
+                                       octaves=octaves, base=self.global_seed + seed_offset)
         
+        # 逐瓦片模式：保留原有的逐点噪声计算
+        noise_field = np.zeros((CHUNK_SIZE, CHUNK_SIZE))
+        for x in range(CHUNK_SIZE):
+            for y in range(CHUNK_SIZE):
+                global_x = chunk_x * CHUNK_SIZE + x
+                global_y = chunk_y * CHUNK_SIZE + y
+                noise_field[x, y] = self._get_continuous_noise(global_x, global_y, scale, octaves, seed_offset)
+        return noise_field
+    
+    def _generate_ocean_chunk(self, chunk_x, chunk_y, main_biome, has_land_neighbor):
+        """生成海洋区块"""
+        # 有陆地邻居时减少水域比例
         # 海洋区块主要是水域，但会有一些岛屿
         if main_biome == "DEEP_OCEAN":
             water_ratio = 0.95 if not has_land_neighbor else 0.85
         else:  # OCEAN
             water_ratio = 0.9 if not has_land_neighbor else 0.75
         
-        # 使用噪声生成水域分布
-        for x in range(CHUNK_SIZE):
-            for y in range(CHUNK_SIZE):
-                # 计算全局坐标用于噪声
-                global_x = chunk_x * CHUNK_SIZE + x
-                global_y = chunk_y * CHUNK_SIZE + y
-                
-                # 使用多层噪声，确保连续性
-                noise_val = 0
-                noise_val += self._get_continuous_noise(global_x, global_y, 0.01, 4, 0) * 0.5
-                noise_val += self._get_continuous_noise(global_x, global_y, 0.05, 2, 1000) * 0.3
-                noise_val += self._get_continuous_noise(global_x, global_y, 0.1, 1, 2000) * 0.2
-                
-                # 根据噪声值决定地形类型
-                if noise_val < water_ratio - 0.4:
-                    chunk[x, y] = 0  # WATER
-                elif noise_val < water_ratio - 0.1:
-                    chunk[x, y] = 2  # SAND (小岛边缘)
-                elif noise_val < water_ratio:
-                    chunk[x, y] = 1  # GRASS (小岛)
-                else:
-                    chunk[x, y] = 1  # GRASS (大岛)
+        # 使用多层噪声生成水域分布，确保连续性
+        noise_val = (self._get_chunk_noise(chunk_x, chunk_y, 0.01, 4, 0) * 0.5
+                     + self._get_chunk_noise(chunk_x, chunk_y, 0.05, 2, 1000) * 0.3
+                     + self._get_chunk_noise(chunk_x, chunk_y, 0.1, 1, 2000) * 0.2)
         
-        return chunk
+        # 根据噪声值决定地形类型
+        return np.select(
+            [noise_val < water_ratio - 0.4,   # WATER
+             noise_val < water_ratio - 0.1],  # SAND (小岛边缘)
+            [0, 2],
+            default=1,                        # GRASS (小岛/大岛)
+        )
     
-    def _generate_beach_chunk(self, chunk_x, chunk_y, neighbor_biomes):
+    def _generate_beach_chunk(self, chunk_x, chunk_y):
         """生成海滩区块"""
-        chunk = np.zeros((CHUNK_SIZE, CHUNK_SIZE), dtype=int)
+        noise_val = self._get_chunk_noise(chunk_x, chunk_y, 0.02, 3, 3000)
         
-        for x in range(CHUNK_SIZE):
-            for y in range(CHUNK_SIZE):
-                global_x = chunk_x * CHUNK_SIZE + x
-                global_y = chunk_y * CHUNK_SIZE + y
-                
-                noise_val = self._get_continuous_noise(global_x, global_y, 0.02, 3, 3000)
-                
-                if noise_val < 0.2:
-                    chunk[x, y] = 0  # WATER
-                elif noise_val < 0.4:
-                    chunk[x, y] = 2  # SAND
-                else:
-                    chunk[x, y] = 1  # GRASS
-        
-        return chunk
+        return np.select(
+            [noise_val < 0.2,   # WATER
+             noise_val < 0.4],  # SAND
+            [0, 2],
+            default=1,          # GRASS
+        )
     
-    def _generate_desert_chunk(self, chunk_x, chunk_y, neighbor_biomes):
+    def _generate_desert_chunk(self, chunk_x, chunk_y, has_ocean_neighbor):
         """生成沙漠区块"""
-        chunk = np.zeros((CHUNK_SIZE, CHUNK_SIZE), dtype=int)
-        
-        # 检查邻近生物群系
-        has_ocean_neighbor = any(biome in ["OCEAN", "DEEP_OCEAN"] for biome in neighbor_biomes.values())
+        noise_val = self._get_chunk_noise(chunk_x, chunk_y, 0.03, 2, 4000)
         
-        for x in range(CHUNK_SIZE):
-            for y in range(CHUNK_SIZE):
-                global_x = chunk_x * CHUNK_SIZE + x
-                global_y = chunk_y * CHUNK_SIZE + y
-                
-                noise_val = self._get_continuous_noise(global_x, global_y, 0.03, 2, 4000)
-                
-                # 根据是否有海洋邻居调整水域比例
-                water_threshold = 0.01 if has_ocean_neighbor else 0.005
-                
-                if noise_val < water_threshold:
-                    chunk[x, y] = 0  # WATER (绿洲)
-                elif noise_val < 0.85:
-                    chunk[x, y] = 6  # DESERT
-                else:
-                    chunk[x, y] = 3  # ROCK (岩石)
+        # 根据是否有海洋邻居调整水域比例
+        water_threshold = 0.01 if has_ocean_neighbor else 0.005
         
-        return chunk
+        return np.select(
+            [noise_val < water_threshold,  # WATER (绿洲)
+             noise_val < 0.85],            # DESERT
+            [0, 6],
+            default=3,                     # ROCK (岩石)
+        )
     
-    def _generate_snow_chunk(self, chunk_x, chunk_y, neighbor_biomes):
+    def _generate_snow_chunk(self, chunk_x, chunk_y, has_ocean_neighbor):
         """生成雪地区块"""
-        chunk = np.zeros((CHUNK_SIZE, CHUNK_SIZE), dtype=int)
+        noise_val = self._get_chunk_noise(chunk_x, chunk_y, 0.025, 3, 5000)
         
-        # 检查邻近生物群系
-        has_ocean_neighbor = any(biome in ["OCEAN", "DEEP_OCEAN"] for biome in neighbor_biomes.values())
+        # 根据是否有海洋邻居调整水域比例
+        water_threshold = 0.01 if has_ocean_neighbor else 0.005
         
-        for x in range(CHUNK_SIZE):
-            for y in range(CHUNK_SIZE):
-                global_x = chunk_x * CHUNK_SIZE + x
-                global_y = chunk_y * CHUNK_SIZE + y
-                
-                noise_val = self._get_continuous_noise(global_x, global_y, 0.025, 3, 5000)
-                
-                # 根据是否有海洋邻居调整水域比例
-                water_threshold = 0.01 if has_ocean_neighbor else 0.005
-                
-                if noise_val < water_threshold:
-                    chunk[x, y] = 0  # WATER (冰湖)
-                elif noise_val < 0.8:
-                    chunk[x, y] = 4  # SNOW
-                else:
-                    chunk[x, y] = 3  # ROCK
-        
-        return chunk
+        return np.select(
+            [noise_val < water_threshold,  # WATER (冰湖)
+             noise_val < 0.8],             # SNOW
+            [0, 4],
+            default=3,                     # ROCK
+        )
     
-    def _generate_mountain_chunk(self, chunk_x, chunk_y, neighbor_biomes):
+    def _generate_mountain_chunk(self, chunk_x, chunk_y, has_ocean_neighbor):
         """生成山地区块"""
-        chunk = np.zeros((CHUNK_SIZE, CHUNK_SIZE), dtype=int)
-        
-        # 检查邻近生物群系
-        has_ocean_neighbor = any(biome in ["OCEAN", "DEEP_OCEAN"] for biome in neighbor_biomes.values())
+        noise_val = self._get_chunk_noise(chunk_x, chunk_y, 0.02, 4, 6000)
         
-        for x in range(CHUNK_SIZE):
-            for y in range(CHUNK_SIZE):
-                global_x = chunk_x * CHUNK_SIZE + x
-                global_y = chunk_y * CHUNK_SIZE + y
-                
-                noise_val = self._get_continuous_noise(global_x, global_y, 0.02, 4, 6000)
-                
-                # 根据是否有海洋邻居调整水域比例
-                water_threshold = 0.01 if has_ocean_neighbor else 0.005
-                
-                if noise_val < water_threshold:
-                    chunk[x, y] = 0  # WATER (山间湖泊)
-                elif noise_val < 0.4:
-                    chunk[x, y] = 1  # GRASS (山脚)
-                else:
-                    chunk[x, y] = 3  # ROCK (山峰)
+        # 根据是否有海洋邻居调整水域比例
+        water_threshold = 0.01 if has_ocean_neighbor else 0.005
         
-        return chunk
+        return np.select(
+            [noise_val < water_threshold,  # WATER (山间湖泊)
+             noise_val < 0.4],             # GRASS (山脚)
+            [0, 1],
+            default=3,                     # ROCK (山峰)
+        )
     
-    def _generate_forest_chunk(self, chunk_x, chunk_y, neighbor_biomes):
+    def _generate_forest_chunk(self, chunk_x, chunk_y, has_ocean_neighbor):
         """生成森林区块"""
-        chunk = np.zeros((CHUNK_SIZE, CHUNK_SIZE), dtype=int)
-        
-        # 检查邻近生物群系
-        has_ocean_neighbor = any(biome in ["OCEAN", "DEEP_OCEAN"] for biome in neighbor_biomes.values())
+        noise_val = self._get_chunk_noise(chunk_x, chunk_y, 0.03, 2, 7000)
         
-        for x in range(CHUNK_SIZE):
-            for y in range(CHUNK_SIZE):
-                global_x = chunk_x * CHUNK_SIZE + x
-                global_y = chunk_y * CHUNK_SIZE + y
-                
-                noise_val = self._get_continuous_noise(global_x, global_y, 0.03, 2, 7000)
-                
-                # 根据是否有海洋邻居调整水域比例
-                water_threshold = 0.01 if has_ocean_neighbor else 0.005
-                
-                if noise_val < water_threshold:
-                    chunk[x, y] = 0  # WATER (小溪)
-                elif noise_val < 0.75:
-                    chunk[x, y] = 5  # FOREST
-                else:
-                    chunk[x, y] = 1  # GRASS (林间空地)
+        # 根据是否有海洋邻居调整水域比例
+        water_threshold = 0.01 if has_ocean_neighbor else 0.005
         
-        return chunk
+        return np.select(
+            [noise_val < water_threshold,  # WATER (小溪)
+             noise_val < 0.75],            # FOREST
+            [0, 5],
+            default=1,                     # GRASS (林间空地)
+        )
     
-    def _generate_grassland_chunk(self, chunk_x, chunk_y, neighbor_biomes):
+    def _generate_grassland_chunk(self, chunk_x, chunk_y, has_ocean_neighbor):
         """生成草原区块"""
-        chunk = np.zeros((CHUNK_SIZE, CHUNK_SIZE), dtype=int)
+        noise_val = self._get_chunk_noise(chunk_x, chunk_y, 0.025, 2, 8000)
         
-        # 检查邻近生物群系，如果是海洋则增加水域
-        has_ocean_neighbor = any(biome in ["OCEAN", "DEEP_OCEAN"] for biome in neighbor_biomes.values())
-        
-        for x in range(CHUNK_SIZE):
-            for y in range(CHUNK_SIZE):
-                global_x = chunk_x * CHUNK_SIZE + x
-                global_y = chunk_y * CHUNK_SIZE + y
-                
-                noise_val = self._get_continuous_noise(global_x, global_y, 0.025, 2, 8000)
-                
-                # 根据是否有海洋邻居调整水域比例
-                water_threshold = 0.005 if has_ocean_neighbor else 0.002
-                
-                if noise_val < water_threshold:
-                    chunk[x, y] = 0  # WATER (小池塘)
-                elif noise_val < 0.85:
-                    chunk[x, y] = 1  # GRASS
-                else:
-                    chunk[x, y] = 5  # FOREST (小片森林)
+        # 根据是否有海洋邻居调整水域比例
+        water_threshold = 0.005 if has_ocean_neighbor else 0.002
         
-        return chunk
+        return np.select(
+            [noise_val < water_threshold,  # WATER (小池塘)
+             noise_val < 0.85],            # GRASS
+            [0, 1],
+            default=5,                     # FOREST (小片森林)
+        )
@@ -1,6 +1,25 @@
 import pygame
 import numpy as np
+import math
 from config import *
+from map_2d_generator import is_uniform_chunk
+from frame_profiler import profiler
+
+# 新地图的摄像机从该区块的中心开始
+START_CHUNK = (0, 0)
+
+
+def get_window_keys(center_x, center_y):
+    """获取以指定区块为中心的加载窗口内的区块坐标"""
+    return {(center_x + dx, center_y + dy)
+            for dx in range(-LOAD_RADIUS, LOAD_RADIUS + 1)
+            for dy in range(-LOAD_RADIUS, LOAD_RADIUS + 1)}
+
+
+def order_by_distance(chunk_keys, center_x, center_y):
+    """按到中心区块的距离由近到远排列区块坐标"""
+    return sorted(chunk_keys, key=lambda key: max(abs(key[0] - center_x), abs(key[1] - center_y)))
+
 
 class Map2DScene:
     def __init__(self, map_generator):
@@ -22,9 +41,14 @@ class Map2DScene:
         self.last_chunk_x = None
         self.last_chunk_y = None
         
-        # 已加载的区块
+        # 已加载的区块（值为 None 表示仍在后台生成）
         self.loaded_chunks = {}
         
+        # 摄像机速度（瓦片/帧）与预取状态
+        self.camera_velocity = (0.0, 0.0)
+        self.prefetch_center = None
+        self.prefetch_chunks = set()
+        
         # 瓦片类型到颜色的映射
         self.tile_colors = {
             0: TILE_TYPES["WATER"],
@@ -35,6 +59,28 @@ class Map2DScene:
             5: TILE_TYPES["FOREST"],
             6: TILE_TYPES["DESERT"],
         }
+        # 8位表面使用的调色板：下标即瓦片类型
+        self.tile_palette = [self.tile_colors[tile_type] for tile_type in range(len(self.tile_colors))]
+        
+        # 视口合成使用的调色板：瓦片类型 + 占位用的生物群系颜色 + 背景色
+        self.placeholder_index_base = len(self.tile_palette)
+        self.background_index = self.placeholder_index_base + len(BIOME_KEYS)
+        self.viewport_palette = (self.tile_palette
+                                 + [BIOME_COLORS[biome] for biome in BIOME_KEYS]
+                                 + [MAP_BACKGROUND_COLOR])
+        self.viewport_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), depth=8)
+        self.viewport_surface.set_palette(self.viewport_palette)
+        
+        # viewport_surface 中上一帧的合成状态（平移时复用）
+        self.frame_key = None      # 上一帧的 (瓦片大小, lod_level)，None 表示没有可复用的帧
+        self.frame_origin = None   # 上一帧左上角的世界像素坐标
+        self.frame_dirty = False   # 可见区块发生变化，需要整帧重绘
+        
+        # 预渲染的区块表面缓存
+        self.chunk_lods = {}             # {chunk_key: LOD 金字塔（众数降采样的瓦片数组列表）}
+        self.chunk_surfaces = {}         # {chunk_key: {lod_level: 每个瓦片1像素的8位表面}}
+        self.scaled_chunk_surfaces = {}  # {chunk_key: 按当前缩放级别放大后的表面}
+        self.scaled_surface_key = None   # scaled_chunk_surfaces 对应的 (边长像素, lod_level)
         
         # 字体
         self.font = pygame.font.Font(None, 24)
@@ -44,22 +90,32 @@ class Map2DScene:
         print(f"开始2D地图，生物群系: {biome_name}, 瓦片坐标: {selected_tile}")
         
         # 重置摄像机位置到初始区块中心
-        self.camera_x = CHUNK_SIZE // 2  # 区块中心X坐标
-        self.camera_y = CHUNK_SIZE // 2  # 区块中心Y坐标
+        self.current_chunk_x, self.current_chunk_y = START_CHUNK
+        self.camera_x = self.current_chunk_x * CHUNK_SIZE + CHUNK_SIZE // 2  # 区块中心X坐标
+        self.camera_y = self.current_chunk_y * CHUNK_SIZE + CHUNK_SIZE // 2  # 区块中心Y坐标
         self.tiles_on_screen = INITIAL_TILES_ON_SCREEN
-        
-        # 计算当前区块位置（初始区块为(0,0)）
-        self.current_chunk_x = 0
-        self.current_chunk_y = 0
         self.last_chunk_x = None
         self.last_chunk_y = None
         
         # 清空已加载的区块
         self.loaded_chunks = {}
+        self.chunk_lods = {}
+        self.chunk_surfaces = {}
+        self.scaled_chunk_surfaces = {}
+        self.frame_key = None
+        self.camera_velocity = (0.0, 0.0)
+        self.prefetch_center = None
+        self.prefetch_chunks = set()
         
         # 加载初始区块
         self._load_chunks_around_current()
     
+    def get_view_state(self):
+        """决定画面内容的状态（包括 UI 文字），与上次渲染时相同则无需重绘"""
+        ready_count = sum(1 for chunk_data in self.loaded_chunks.values() if chunk_data is not None)
+        return (self.camera_x, self.camera_y, self.tiles_on_screen, self.frame_dirty,
+                ready_count, len(self.loaded_chunks), self._get_cache_text())
+    
     def handle_event(self, event):
         """处理事件"""
         if event.type == pygame.KEYDOWN:
@@ -81,24 +137,37 @@ class Map2DScene:
         tile_size = SCREEN_WIDTH / self.tiles_on_screen
         move_speed = CAMERA_SPEED * tile_size / TILE_SIZE
         
+        velocity_x, velocity_y = 0.0, 0.0
         if keys[pygame.K_w] or keys[pygame.K_UP]:
-            self.camera_y -= move_speed
+            velocity_y -= move_speed
         if keys[pygame.K_s] or keys[pygame.K_DOWN]:
-            self.camera_y += move_speed
+            velocity_y += move_speed
         if keys[pygame.K_a] or keys[pygame.K_LEFT]:
-            self.camera_x -= move_speed
+            velocity_x -= move_speed
         if keys[pygame.K_d] or keys[pygame.K_RIGHT]:
-            self.camera_x += move_speed
+            velocity_x += move_speed
+        self.camera_x += velocity_x
+        self.camera_y += velocity_y
+        self.camera_velocity = (velocity_x, velocity_y)
         
-        # 检查是否需要加载新区块
-        self._update_current_chunk()
+        with profiler.phase("chunks"):
+            # 检查是否需要加载新区块
+            self._update_current_chunk()
+            
+            # 根据移动方向预取即将进入视野的区块
+            self._prefetch_chunks()
+            
+            # 接收后台生成完成的区块
+            self._collect_finished_chunks()
     
     def _handle_mouse_wheel(self, wheel_direction):
         """处理鼠标滚轮缩放"""
+        # 缩放步长与当前瓦片数量成正比，远景下也能较快缩放
+        zoom_step = max(ZOOM_SPEED * 10, self.tiles_on_screen * ZOOM_SPEED)
         if wheel_direction > 0:  # 向上滚动，放大
-            self.tiles_on_screen = max(MIN_TILES_ON_SCREEN, self.tiles_on_screen - ZOOM_SPEED * 10)
+            self.tiles_on_screen = max(MIN_TILES_ON_SCREEN, self.tiles_on_screen - zoom_step)
         else:  # 向下滚动，缩小
-            self.tiles_on_screen = min(MAX_TILES_ON_SCREEN, self.tiles_on_screen + ZOOM_SPEED * 10)
+            self.tiles_on_screen = min(MAX_TILES_ON_SCREEN, self.tiles_on_screen + zoom_step)
     
     def _update_current_chunk(self):
         """更新当前区块位置"""
@@ -113,38 +182,212 @@ class Map2DScene:
             self.current_chunk_y = new_chunk_y
             self._load_chunks_around_current()
     
+    def _request_chunks(self, chunk_keys, center_x, center_y):
+        """按到中心区块的距离由近到远请求区块，返回 {chunk_key: chunk_data}"""
+        return {chunk_key: self.map_generator.request_chunk(*chunk_key)
+                for chunk_key in order_by_distance(chunk_keys, center_x, center_y)}
+    
+    def _pin_chunks(self):
+        """固定加载窗口和预取中的区块，避免被缓存淘汰"""
+        self.map_generator.pin_chunks(self.loaded_chunks.keys() | self.prefetch_chunks)
+    
     def _load_chunks_around_current(self):
-        """加载当前区块周围的区块"""
-        # 清空已加载的区块
-        self.loaded_chunks = {}
+        """增量更新当前区块周围的加载窗口：只处理进入和离开窗口的区块"""
+        window_keys = get_window_keys(self.current_chunk_x, self.current_chunk_y)
+        leaving_keys = self.loaded_chunks.keys() - window_keys
+        entering_keys = window_keys - self.loaded_chunks.keys()
         
-        # 加载周围区块
-        for dx in range(-LOAD_RADIUS, LOAD_RADIUS + 1):
-            for dy in range(-LOAD_RADIUS, LOAD_RADIUS + 1):
-                chunk_x = self.current_chunk_x + dx
-                chunk_y = self.current_chunk_y + dy
-                chunk_key = (chunk_x, chunk_y)
-                
-                # 获取区块数据
-                chunk_data = self.map_generator.get_chunk(chunk_x, chunk_y)
-                self.loaded_chunks[chunk_key] = chunk_data
+        # 移除离开窗口的区块及其预渲染表面
+        for chunk_key in leaving_keys:
+            del self.loaded_chunks[chunk_key]
+            self.chunk_lods.pop(chunk_key, None)
+            self.chunk_surfaces.pop(chunk_key, None)
+            self.scaled_chunk_surfaces.pop(chunk_key, None)
+            self._invalidate_chunk(chunk_key)
+        
+        # 请求进入窗口的区块（未生成的区块在后台生成，暂时为 None）
+        self.loaded_chunks.update(self._request_chunks(entering_keys, self.current_chunk_x, self.current_chunk_y))
+        for chunk_key in entering_keys:
+            self._store_chunk_lod(chunk_key)
+            self._invalidate_chunk(chunk_key)
+        self._pin_chunks()
+        
+        print(f"加载了 {len(entering_keys)} 个区块，卸载了 {len(leaving_keys)} 个区块，中心位置: ({self.current_chunk_x}, {self.current_chunk_y})")
+    
+    def _prefetch_chunks(self):
+        """根据摄像机的移动方向和速度，提前请求即将进入加载窗口的区块"""
+        if not self.map_generator.async_loading:
+            # 同步生成时预取会阻塞渲染，直接跳过
+            return
+        
+        # 预测若干帧之后摄像机所在的区块
+        velocity_x, velocity_y = self.camera_velocity
+        predicted_x = int((self.camera_x + velocity_x * PREFETCH_LOOKAHEAD_FRAMES) // CHUNK_SIZE)
+        predicted_y = int((self.camera_y + velocity_y * PREFETCH_LOOKAHEAD_FRAMES) // CHUNK_SIZE)
+        predicted_center = (predicted_x, predicted_y)
+        if predicted_center == self.prefetch_center:
+            return
+        self.prefetch_center = predicted_center
         
-        print(f"加载了 {len(self.loaded_chunks)} 个区块，中心位置: ({self.current_chunk_x}, {self.current_chunk_y})")
+        # 预测位置的加载窗口中尚未加载的区块
+        if predicted_center == (self.current_chunk_x, self.current_chunk_y):
+            self.prefetch_chunks = set()
+        else:
+            self.prefetch_chunks = get_window_keys(predicted_x, predicted_y) - self.loaded_chunks.keys()
+        self._pin_chunks()
+        self._request_chunks(self.prefetch_chunks, predicted_x, predicted_y)
+    
+    def _collect_finished_chunks(self):
+        """将后台生成完成的区块放入已加载区块"""
+        for chunk_key, chunk_data in self.map_generator.collect_finished_chunks().items():
+            if chunk_key in self.loaded_chunks:
+                self.loaded_chunks[chunk_key] = chunk_data
+                self._store_chunk_lod(chunk_key)
+                self._invalidate_chunk(chunk_key)
+    
+    def _store_chunk_lod(self, chunk_key):
+        """区块到达加载窗口时取得其 LOD 金字塔，绘制时不再构建"""
+        chunk_data = self.loaded_chunks[chunk_key]
+        if chunk_data is not None and not is_uniform_chunk(chunk_data):
+            self.chunk_lods[chunk_key] = self.map_generator.take_chunk_lod(chunk_key, chunk_data)
     
     def draw(self):
         """绘制2D地图"""
-        self.screen.fill((50, 50, 50))  # 深灰色背景
+        self.screen.fill(MAP_BACKGROUND_COLOR)  # 深灰色背景
         
         # 计算当前瓦片大小
         tile_size = SCREEN_WIDTH / self.tiles_on_screen
         
-        # 计算可见区域（基于瓦片坐标）
-        visible_left = int(self.camera_x - SCREEN_WIDTH // 2 / tile_size)
-        visible_top = int(self.camera_y - SCREEN_HEIGHT // 2 / tile_size)
-        visible_right = int(self.camera_x + SCREEN_WIDTH // 2 / tile_size)
-        visible_bottom = int(self.camera_y + SCREEN_HEIGHT // 2 / tile_size)
+        with profiler.phase("map"):
+            if VIEWPORT_COMPOSITOR:
+                self._draw_viewport(tile_size)
+            else:
+                self._draw_visible_chunks(tile_size)
         
-        # 绘制可见的区块
+        with profiler.phase("ui"):
+            # 绘制区块边界（如果启用）
+            if SHOW_CHUNK_BORDERS:
+                self._draw_chunk_borders(tile_size)
+            
+            # 绘制UI信息
+            self._draw_ui()
+    
+    def _draw_viewport(self, tile_size):
+        """视口合成：只取出可见范围内的瓦片，经调色板映射到一张屏幕大小的缓冲区后一次性绘制"""
+        lod_level = self._get_lod_level(tile_size)
+        
+        # 视口左上角的世界像素坐标（取整到像素，平移时上一帧可以按整像素复用）
+        origin_x = math.floor(self.camera_x * tile_size) - SCREEN_WIDTH // 2
+        origin_y = math.floor(self.camera_y * tile_size) - SCREEN_HEIGHT // 2
+        frame_key = (tile_size, lod_level)
+        
+        if self._can_scroll_frame(frame_key, origin_x, origin_y):
+            self._scroll_frame(origin_x, origin_y, tile_size, lod_level)
+        else:
+            self._rasterize_into((0, 0, SCREEN_WIDTH, SCREEN_HEIGHT), origin_x, origin_y, tile_size, lod_level)
+        self.frame_key = frame_key
+        self.frame_origin = (origin_x, origin_y)
+        self.frame_dirty = False
+        
+        self.screen.blit(self.viewport_surface, (0, 0))
+    
+    def _can_scroll_frame(self, frame_key, origin_x, origin_y):
+        """判断能否平移复用上一帧：缩放未变、没有新区块到达且位移不大"""
+        if not SCROLL_FRAME_REUSE or self.frame_dirty or frame_key != self.frame_key:
+            return False
+        shift_x = origin_x - self.frame_origin[0]
+        shift_y = origin_y - self.frame_origin[1]
+        return (abs(shift_x) <= SCREEN_WIDTH * SCROLL_REDRAW_FRACTION and
+                abs(shift_y) <= SCREEN_HEIGHT * SCROLL_REDRAW_FRACTION)
+    
+    def _scroll_frame(self, origin_x, origin_y, tile_size, lod_level):
+        """按摄像机位移平移上一帧，只重新合成新露出的边缘条带"""
+        shift_x = origin_x - self.frame_origin[0]
+        shift_y = origin_y - self.frame_origin[1]
+        if shift_x == 0 and shift_y == 0:
+            return
+        
+        # 新帧 (x, y) 处的像素即上一帧 (x + shift_x, y + shift_y) 处的像素
+        self.viewport_surface.scroll(-shift_x, -shift_y)
+        
+        # 左右两侧露出的整列
+        if shift_x != 0:
+            left = SCREEN_WIDTH - shift_x if shift_x > 0 else 0
+            self._rasterize_into((left, 0, abs(shift_x), SCREEN_HEIGHT), origin_x, origin_y, tile_size, lod_level)
+        # 上下两侧露出的整行
+        if shift_y != 0:
+            top = SCREEN_HEIGHT - shift_y if shift_y > 0 else 0
+            self._rasterize_into((0, top, SCREEN_WIDTH, abs(shift_y)), origin_x, origin_y, tile_size, lod_level)
+    
+    def _rasterize_into(self, rect, origin_x, origin_y, tile_size, lod_level):
+        """合成视口中的一块矩形区域（屏幕坐标），写入 viewport_surface"""
+        left, top, width, height = rect
+        lod_scale = 1 << lod_level  # 每个 LOD 瓦片覆盖的瓦片数
+        
+        # 每个像素中心对应的（LOD）瓦片坐标
+        pixel_x = np.arange(origin_x + left, origin_x + left + width) + 0.5
+        pixel_y = np.arange(origin_y + top, origin_y + top + height) + 0.5
+        tile_x = np.floor(pixel_x / tile_size / lod_scale).astype(np.int64)
+        tile_y = np.floor(pixel_y / tile_size / lod_scale).astype(np.int64)
+        
+        # 计算可见区域（基于瓦片坐标）并拼接该区域的瓦片
+        visible_left, visible_right = tile_x[0], tile_x[-1]
+        visible_top, visible_bottom = tile_y[0], tile_y[-1]
+        tile_window = self._compose_tile_window(visible_left, visible_top,
+                                                visible_right - visible_left + 1,
+                                                visible_bottom - visible_top + 1, lod_level)
+        
+        # 按像素取样瓦片窗口，写入8位缓冲区
+        pixels = np.take(np.take(tile_window, tile_x - visible_left, axis=0), tile_y - visible_top, axis=1)
+        pygame.surfarray.blit_array(self.viewport_surface.subsurface(rect), pixels)
+    
+    def _invalidate_chunk(self, chunk_key):
+        """区块内容变化时，若其位于上一帧范围内则要求整帧重绘"""
+        if self.frame_key is None:
+            return
+        tile_size = self.frame_key[0]
+        chunk_left = chunk_key[0] * CHUNK_SIZE * tile_size - self.frame_origin[0]
+        chunk_top = chunk_key[1] * CHUNK_SIZE * tile_size - self.frame_origin[1]
+        chunk_pixels = CHUNK_SIZE * tile_size
+        if (chunk_left + chunk_pixels > 0 and chunk_left < SCREEN_WIDTH and
+            chunk_top + chunk_pixels > 0 and chunk_top < SCREEN_HEIGHT):
+            self.frame_dirty = True
+    
+    def _compose_tile_window(self, left, top, width, height, lod_level):
+        """跨区块边界拼接瓦片窗口，返回视口调色板下标数组（坐标单位为 LOD 瓦片）"""
+        chunk_units = CHUNK_SIZE >> lod_level
+        tile_window = np.full((width, height), self.background_index, dtype=np.uint8)
+        
+        for chunk_x in range(left // chunk_units, (left + width - 1) // chunk_units + 1):
+            for chunk_y in range(top // chunk_units, (top + height - 1) // chunk_units + 1):
+                chunk_key = (chunk_x, chunk_y)
+                if chunk_key not in self.loaded_chunks:
+                    continue
+                
+                # 区块与窗口的重叠范围
+                x0 = max(left, chunk_x * chunk_units)
+                x1 = min(left + width, (chunk_x + 1) * chunk_units)
+                y0 = max(top, chunk_y * chunk_units)
+                y1 = min(top + height, (chunk_y + 1) * chunk_units)
+                target = tile_window[x0 - left:x1 - left, y0 - top:y1 - top]
+                
+                chunk_data = self.loaded_chunks[chunk_key]
+                if chunk_data is None:
+                    # 区块尚未生成，用对应球面瓦片的生物群系颜色占位
+                    biome = self.map_generator.get_chunk_biome(chunk_x, chunk_y)
+                    target[...] = self.placeholder_index_base + BIOME_IDS[biome]
+                elif is_uniform_chunk(chunk_data):
+                    target[...] = chunk_data
+                else:
+                    tiles = self._get_chunk_tiles(chunk_key, chunk_data, lod_level)
+                    target[...] = tiles[x0 - chunk_x * chunk_units:x1 - chunk_x * chunk_units,
+                                        y0 - chunk_y * chunk_units:y1 - chunk_y * chunk_units]
+        
+        return tile_window
+    
+    def _draw_visible_chunks(self, tile_size):
+        """逐区块绘制：将每个可见区块的预渲染表面放大后绘制"""
+        drawn_chunk_keys = set()
         for chunk_key, chunk_data in self.loaded_chunks.items():
             chunk_x, chunk_y = chunk_key
             
@@ -160,42 +403,71 @@ class Map2DScene:
             if (chunk_screen_x + chunk_screen_width > 0 and chunk_screen_x < SCREEN_WIDTH and
                 chunk_screen_y + chunk_screen_height > 0 and chunk_screen_y < SCREEN_HEIGHT):
                 
-                self._draw_chunk(chunk_data, chunk_screen_x, chunk_screen_y, tile_size)
-        
-        # 绘制区块边界（如果启用）
-        if SHOW_CHUNK_BORDERS:
-            self._draw_chunk_borders(tile_size)
-        
-        # 绘制UI信息
-        self._draw_ui()
+                if chunk_data is None:
+                    # 区块尚未生成，用对应球面瓦片的生物群系颜色占位
+                    placeholder_color = self.map_generator.get_placeholder_color(chunk_x, chunk_y)
+                    pygame.draw.rect(self.screen, placeholder_color,
+                                   (chunk_screen_x, chunk_screen_y, chunk_screen_width, chunk_screen_height))
+                else:
+                    self._draw_chunk(chunk_key, chunk_data, chunk_screen_x, chunk_screen_y, tile_size)
+                    drawn_chunk_keys.add(chunk_key)
         
-        pygame.display.flip()
+        # 只保留本帧可见区块的放大表面，避免占用过多内存
+        for chunk_key in self.scaled_chunk_surfaces.keys() - drawn_chunk_keys:
+            del self.scaled_chunk_surfaces[chunk_key]
     
-    def _draw_chunk(self, chunk_data, screen_x, screen_y, tile_size):
+    def _draw_chunk(self, chunk_key, chunk_data, screen_x, screen_y, tile_size):
         """绘制单个区块"""
-        # 如果瓦片太小，只绘制一个代表色
-        if tile_size < 2:
-            # 计算区块的主要颜色
-            unique_types, counts = np.unique(chunk_data, return_counts=True)
-            main_type = unique_types[np.argmax(counts)]
-            tile_color = self.tile_colors.get(main_type, (100, 100, 100))
+        # 单一瓦片类型的区块直接绘制一个矩形
+        if is_uniform_chunk(chunk_data):
+            tile_color = self.tile_colors.get(int(chunk_data), (100, 100, 100))
             pygame.draw.rect(self.screen, tile_color, (screen_x, screen_y, CHUNK_SIZE * tile_size, CHUNK_SIZE * tile_size))
         else:
-            # 绘制区块中的每个瓦片
-            step = max(1, int(tile_size // 4))  # 根据瓦片大小调整绘制步长
-            for x in range(0, CHUNK_SIZE, step):
-                for y in range(0, CHUNK_SIZE, step):
-                    if x < CHUNK_SIZE and y < CHUNK_SIZE:
-                        tile_type = chunk_data[x, y]
-                        tile_color = self.tile_colors.get(tile_type, (100, 100, 100))
-                        
-                        # 计算瓦片在屏幕上的位置
-                        tile_screen_x = screen_x + x * tile_size
-                        tile_screen_y = screen_y + y * tile_size
-                        
-                        # 绘制瓦片
-                        pygame.draw.rect(self.screen, tile_color, 
-                                       (tile_screen_x, tile_screen_y, tile_size * step, tile_size * step))
+            # 使用预渲染并按当前缩放级别放大的区块表面
+            # 边长向上取整，相邻区块最多重叠1像素而不会出现缝隙
+            scaled_size = math.ceil(CHUNK_SIZE * tile_size)
+            lod_level = self._get_lod_level(tile_size)
+            surface = self._get_scaled_chunk_surface(chunk_key, chunk_data, scaled_size, lod_level)
+            self.screen.blit(surface, (round(screen_x), round(screen_y)))
+    
+    def _get_lod_level(self, tile_size):
+        """根据瓦片像素大小选择 LOD 级别：保证每个 LOD 瓦片至少占 LOD_MIN_TILE_PIXELS 像素"""
+        if tile_size >= LOD_MIN_TILE_PIXELS:
+            return 0
+        max_level = int(math.log2(CHUNK_SIZE))
+        return min(max_level, math.ceil(math.log2(LOD_MIN_TILE_PIXELS / tile_size)))
+    
+    def _get_chunk_tiles(self, chunk_key, chunk_data, lod_level):
+        """获取区块指定 LOD 级别的瓦片数组"""
+        if lod_level == 0:
+            return chunk_data
+        # LOD 金字塔在区块到达时已取得（见 _store_chunk_lod）
+        return self.chunk_lods[chunk_key][lod_level]
+    
+    def _get_chunk_surface(self, chunk_key, chunk_data, lod_level):
+        """获取区块指定 LOD 级别的预渲染表面：瓦片数组经调色板直接写入8位表面，只生成一次"""
+        level_surfaces = self.chunk_surfaces.setdefault(chunk_key, {})
+        surface = level_surfaces.get(lod_level)
+        if surface is None:
+            tiles = self._get_chunk_tiles(chunk_key, chunk_data, lod_level)
+            surface = pygame.Surface(tiles.shape, depth=8)
+            surface.set_palette(self.tile_palette)
+            pygame.surfarray.blit_array(surface, tiles)
+            level_surfaces[lod_level] = surface
+        return surface
+    
+    def _get_scaled_chunk_surface(self, chunk_key, chunk_data, scaled_size, lod_level):
+        """获取按当前缩放级别放大的区块表面，缩放级别变化时全部失效"""
+        if (scaled_size, lod_level) != self.scaled_surface_key:
+            self.scaled_chunk_surfaces = {}
+            self.scaled_surface_key = (scaled_size, lod_level)
+        
+        surface = self.scaled_chunk_surfaces.get(chunk_key)
+        if surface is None:
+            surface = pygame.transform.scale(self._get_chunk_surface(chunk_key, chunk_data, lod_level),
+                                             (scaled_size, scaled_size))
+            self.scaled_chunk_surfaces[chunk_key] = surface
+        return surface
     
     def _draw_chunk_borders(self, tile_size):
         """绘制区块边界"""
@@ -241,15 +513,30 @@ class Map2DScene:
         self.screen.blit(chunk_surface, (10, 60))
         
         # 显示已加载区块数量
-        loaded_text = f"Loaded Chunks: {len(self.loaded_chunks)}"
+        ready_count = sum(1 for chunk_data in self.loaded_chunks.values() if chunk_data is not None)
+        loaded_text = f"Loaded Chunks: {ready_count}/{len(self.loaded_chunks)}"
         loaded_surface = self.font.render(loaded_text, True, (255, 255, 255))
         self.screen.blit(loaded_surface, (10, 85))
         
+        # 显示区块缓存统计
+        cache_surface = self.font.render(self._get_cache_text(), True, (255, 255, 255))
+        self.screen.blit(cache_surface, (10, 110))
+        
         # 显示控制提示
         controls_text = "WASD/Arrows: Move | Mouse Wheel: Zoom | M: Switch Scene | ESC: Back to Planet"
         controls_surface = self.font.render(controls_text, True, (200, 200, 200))
         self.screen.blit(controls_surface, (10, SCREEN_HEIGHT - 25))
     
+    def _get_cache_text(self):
+        """区块缓存统计的显示文字"""
+        cache_stats = self.map_generator.get_cache_stats()
+        return (f"Chunk Cache: {cache_stats['entries']} chunks, {cache_stats['bytes'] / (1024 * 1024):.1f} MiB, "
+                f"hit {cache_stats['hit_rate']:.0%}, evicted {cache_stats['evictions']}")
+    
     def set_scene_manager(self, scene_manager):
         """设置场景管理器"""
         self.scene_manager = scene_manager
+    
+    def shutdown(self):
+        """释放场景占用的后台资源"""
+        self.map_generator.shutdown()
@@ -1,37 +1,226 @@
+import os
+import hashlib
 import numpy as np
 import noise
 import math
+import array_noise
 from config import *
+from disk_budget import prune_cache_keys
+
+# 行星生成器版本：修改球面网格或生物群系规则后递增，使磁盘缓存中的旧行星失效
+PLANET_GENERATOR_VERSION = 3
+
+# 生物群系调色板：BIOME_PALETTE[biome_id] 即该生物群系的 RGB 颜色
+BIOME_PALETTE = np.array([BIOME_COLORS[biome] for biome in BIOME_KEYS], dtype=np.uint8)
+
+def get_grid_lat_lon(resolution):
+    """等经纬度瓦片网格各行的纬度和各列的经度"""
+    lat_step = np.pi / (resolution - 1)
+    lon_step = 2 * np.pi / (resolution - 1)
+    lats = np.arange(-np.pi / 2, np.pi / 2 + lat_step, lat_step)[:resolution]
+    lons = np.arange(-np.pi, np.pi + lon_step, lon_step)[:resolution]
+    return lats, lons
+
+class EqualAreaLayout:
+    """等面积采样布局：纬线与瓦片网格的行相同，每条纬线上的采样点数与其周长成正比
+
+    赤道上的采样密度与瓦片网格相同，越靠近两极采样点越少，总数约为网格的 2/π。
+    瓦片仍按网格的 (row, col) 寻址，tiles_to_samples 把瓦片映射到代表它的采样点。
+    """
+
+    def __init__(self, resolution):
+        self.resolution = resolution
+        lats, self.grid_lons = get_grid_lat_lon(resolution)
+        self.ring_sizes = np.maximum(1, np.rint((resolution - 1) * np.cos(lats))).astype(np.int64)
+        self.ring_offsets = np.concatenate(([0], np.cumsum(self.ring_sizes)[:-1]))
+        self.sample_count = int(self.ring_sizes.sum())
+        # lons_to_samples 使用的 float32/int32 查找表
+        self._ring_sizes_i32 = self.ring_sizes.astype(np.int32)
+        self._ring_offsets_i32 = self.ring_offsets.astype(np.int32)
+        self._ring_scales = (self.ring_sizes / (2 * np.pi)).astype(np.float32)
+
+        # 每个采样点所在的行、纬度和经度（同一纬线上的采样点从 -π 起等间距排列）
+        self.sample_rows = np.repeat(np.arange(resolution), self.ring_sizes)
+        ring_positions = np.arange(self.sample_count) - self.ring_offsets[self.sample_rows]
+        self.sample_lats = lats[self.sample_rows]
+        self.sample_lons = -np.pi + ring_positions * (2 * np.pi / self.ring_sizes[self.sample_rows])
+
+    def tiles_to_samples(self, rows, cols):
+        """瓦片 (row, col) 对应的采样点序号：同一纬线上经度最接近的采样点"""
+        sizes = self.ring_sizes[rows]
+        positions = np.rint((self.grid_lons[cols] + np.pi) / (2 * np.pi) * sizes).astype(np.int64) % sizes
+        return self.ring_offsets[rows] + positions
+
+    def lons_to_samples(self, rows, lons):
+        """纬线 rows 上经度为 lons 的位置最近的采样点序号（按 float32 计算，用于逐像素采样）"""
+        sizes = self._ring_sizes_i32[rows]
+        positions = np.rint((lons + np.float32(np.pi)) * self._ring_scales[rows]).astype(np.int32)
+        # 经度接近 π 时取整到 sizes，与 -π 处的第一个采样点是同一位置
+        positions[positions >= sizes] = 0
+        return self._ring_offsets_i32[rows] + positions
+
+    def snap_lons_to_cols(self, rows, lons):
+        """把纬线 rows 上经度为 lons 的位置吸附到最近的采样点，返回映射到该采样点的瓦片列号"""
+        samples = self.lons_to_samples(rows, lons)
+        # 每条纬线的采样间距不小于网格列间距，离采样点最近的列会映射回该采样点
+        lon_step = 2 * np.pi / (self.resolution - 1)
+        return np.clip(np.rint((self.sample_lons[samples] + np.pi) / lon_step).astype(np.int32),
+                       0, self.resolution - 1)
+
+    def get_tile_sample_map(self):
+        """整个瓦片网格到采样点序号的映射 (resolution, resolution)"""
+        rows, cols = np.meshgrid(np.arange(self.resolution), np.arange(self.resolution), indexing="ij")
+        return self.tiles_to_samples(rows, cols)
+
+    def subsample(self, stride):
+        """每隔 stride 条纬线取一条，每条纬线上每隔 stride 个采样点取一个，返回采样点序号"""
+        return np.concatenate([self.ring_offsets[row] + np.arange(0, self.ring_sizes[row], stride)
+                               for row in range(0, self.resolution, stride)])
 
 class PlanetGenerator:
-    def __init__(self, resolution, seed):
+    def __init__(self, resolution, seed, vectorized=VECTORIZED_PLANET_GENERATION, sampling=PLANET_SAMPLING):
+        if sampling == "equal_area" and not vectorized:
+            # 等面积采样只有批量实现，逐点生成只支持瓦片网格
+            raise ValueError("equal_area sampling requires vectorized planet generation")
         self.resolution = resolution
         self.seed = seed
-        self.points = np.zeros((resolution, resolution, 3))
-        self.colors = np.zeros((resolution, resolution, 3))
+        self.vectorized = vectorized  # 是否按整网格批量生成（否则逐点循环）
+        self.sampling = sampling      # "grid"：每个瓦片一个采样点；"equal_area"：按 EqualAreaLayout 采样
+        self.layout = EqualAreaLayout(resolution) if sampling == "equal_area" else None
+        self.biomes = np.zeros((resolution, resolution), dtype=np.uint8)  # 每个瓦片的生物群系编号
+        if self.layout is None:
+            self.points = np.zeros((resolution, resolution, 3), dtype=np.float32)  # 球面单位向量，以 float32 存储
+            self.sample_biomes = None
+        else:
+            self.points = np.zeros((self.layout.sample_count, 3), dtype=np.float32)
+            self.sample_biomes = np.zeros(self.layout.sample_count, dtype=np.uint8)  # 每个采样点的生物群系编号
+
+    @property
+    def colors(self):
+        """由生物群系编号经调色板得到的颜色 (resolution, resolution, 3)"""
+        return BIOME_PALETTE[self.biomes]
+
+    def get_biome(self, row, col):
+        """获取瓦片的生物群系名称（BIOME_COLORS 中的键）"""
+        return BIOME_KEYS[self.biomes[row, col]]
+
+    def get_tile_point(self, row, col):
+        """瓦片在球面上的位置（等面积采样时为代表该瓦片的采样点）"""
+        if self.layout is None:
+            return self.points[row, col]
+        return self.points[self.layout.tiles_to_samples(row, col)]
+
+    def get_samples(self, stride=1):
+        """绘制用的采样点 (点坐标 (N, 3), 生物群系编号 (N,))，stride 大于 1 时沿纬线和经线方向降采样"""
+        if self.layout is None:
+            # 降采样后的数据复制成连续数组（原数据可能是内存映射）
+            return (np.ascontiguousarray(self.points[::stride, ::stride]).reshape(-1, 3),
+                    np.ascontiguousarray(self.biomes[::stride, ::stride]).reshape(-1))
+        indices = self.layout.subsample(stride)
+        return self.points[indices], self.sample_biomes[indices]
+
+    def load_or_generate(self, cache_dir=PLANET_CACHE_DIR, max_cache_bytes=PLANET_CACHE_MAX_BYTES):
+        """优先从磁盘缓存加载行星数据（内存映射），未命中时生成并写入缓存；cache_dir 为 None 时直接生成
+
+        缓存总大小超过 max_cache_bytes 时按最近使用时间删除其他行星的缓存。
+        """
+        if cache_dir is None:
+            self.generate()
+            return
+        cache_key = self._get_cache_key()
+        cache_path = os.path.join(cache_dir, cache_key)
+        if self._load_cache(cache_path):
+            print(f"Loaded planet with seed: {self.seed} from cache.")
+        else:
+            self.generate()
+            self._save_cache(cache_path)
+        prune_cache_keys(cache_dir, max_cache_bytes, cache_key)
+
+    def _get_cache_key(self):
+        """缓存键：决定生成结果的全部参数的哈希"""
+        mode = "array" if self.vectorized else "loop"
+        params = (self.seed, self.resolution, SCALE, OCTAVES, PERSISTENCE, LACUNARITY,
+                  PLANET_GENERATOR_VERSION, mode, self.sampling)
+        return hashlib.sha1(repr(params).encode()).hexdigest()[:16]
+
+    def _load_cache(self, cache_path):
+        """以只读内存映射加载缓存的球面点和生物群系，成功时返回 True"""
+        try:
+            points = np.load(os.path.join(cache_path, "points.npy"), mmap_mode="r")
+            biomes = np.load(os.path.join(cache_path, "biomes.npy"), mmap_mode="r")
+        except (OSError, ValueError):
+            return False
+        if points.shape != self.points.shape or biomes.shape != self.points.shape[:-1]:
+            return False
+        self.points = points
+        if self.layout is None:
+            self.biomes = biomes
+        else:
+            # 等面积采样时缓存的是每个采样点的生物群系，瓦片网格由映射重建
+            self.sample_biomes = biomes
+            self.biomes = biomes[self.layout.get_tile_sample_map()]
+        return True
+
+    def _save_cache(self, cache_path):
+        """写入缓存；先写临时文件再替换，中途退出不会留下不完整的缓存"""
+        try:
+            os.makedirs(cache_path, exist_ok=True)
+            biomes = self.biomes if self.layout is None else self.sample_biomes
+            for name, array in (("points", self.points), ("biomes", biomes)):
+                temp_path = os.path.join(cache_path, f"{name}.tmp.npy")
+                np.save(temp_path, array)
+                os.replace(temp_path, os.path.join(cache_path, f"{name}.npy"))
+        except OSError as error:
+            print(f"Failed to write planet cache: {error}")
 
     def generate(self):
         print(f"Generating planet with seed: {self.seed}...")
-        lat_step = np.pi / (self.resolution - 1)
-        lon_step = 2 * np.pi / (self.resolution - 1)
-        lats = np.arange(-np.pi / 2, np.pi / 2 + lat_step, lat_step)
-        lons = np.arange(-np.pi, np.pi + lon_step, lon_step)
+        lats, lons = get_grid_lat_lon(self.resolution)
 
-        for i in range(self.resolution):
-            for j in range(self.resolution):
-                lat, lon = lats[i], lons[j]
-                x = math.cos(lat) * math.cos(lon)
-                y = math.cos(lat) * math.sin(lon)
-                z = math.sin(lat)
-                self.points[i, j] = [x, y, z]
-        self._generate_biomes()
+        if self.layout is not None:
+            # 等面积采样：只在采样点上计算噪声，瓦片网格由映射得到
+            self.points = self._get_sphere_points(self.layout.sample_lats, self.layout.sample_lons)
+            self.sample_biomes = self._generate_biomes_vectorized(self.layout.sample_rows)
+            self.biomes = self.sample_biomes[self.layout.get_tile_sample_map()]
+        elif self.vectorized:
+            # 批量计算所有球面点
+            lat_grid, lon_grid = np.meshgrid(lats, lons, indexing="ij")
+            self.points = self._get_sphere_points(lat_grid, lon_grid)
+            self.biomes = self._generate_biomes_vectorized(np.arange(self.resolution)[:, None])
+        else:
+            self.points = np.zeros((self.resolution, self.resolution, 3))
+            for i in range(self.resolution):
+                for j in range(self.resolution):
+                    lat, lon = lats[i], lons[j]
+                    x = math.cos(lat) * math.cos(lon)
+                    y = math.cos(lat) * math.sin(lon)
+                    z = math.sin(lat)
+                    self.points[i, j] = [x, y, z]
+            self._generate_biomes()
+        # 生物群系在 float64 精度下计算（与逐点版本的阈值判断一致），之后球面点以 float32 存储
+        self.points = self.points.astype(np.float32)
         print("Planet generation complete.")
 
+    def _get_sphere_points(self, lats, lons):
+        """经纬度数组对应的球面单位向量，最后一维为 (x, y, z)"""
+        return np.stack([np.cos(lats) * np.cos(lons),
+                         np.cos(lats) * np.sin(lons),
+                         np.sin(lats)], axis=-1)
+
     def _get_noise_value(self, x, y, z, custom_seed):
         return noise.pnoise3(x * SCALE, y * SCALE, z * SCALE,
                              octaves=OCTAVES, persistence=PERSISTENCE,
                              lacunarity=LACUNARITY, base=self.seed + custom_seed)
 
+    def _get_noise_field(self, custom_seed):
+        """对所有球面点一次性计算噪声，结果映射到 [0, 1]"""
+        x, y, z = self.points[..., 0], self.points[..., 1], self.points[..., 2]
+        field = array_noise.pnoise3(x * SCALE, y * SCALE, z * SCALE,
+                                    octaves=OCTAVES, persistence=PERSISTENCE,
+                                    lacunarity=LACUNARITY, base=self.seed + custom_seed)
+        # 与逐点版本一样在 float64 下做后续运算，保证阈值判断一致
+        return (field.astype(np.float64) + 1) / 2
+
     def _generate_biomes(self):
         for i in range(self.resolution):
             for j in range(self.resolution):
@@ -42,7 +231,15 @@ class PlanetGenerator:
                 temperature = base_temp * 0.7 + temp_noise * 0.3
                 humidity = (self._get_noise_value(x, y, z, 2) + 1) / 2
                 biome = self._determine_biome(elevation, temperature, humidity)
-                self.colors[i, j] = BIOME_COLORS[biome]
+                self.biomes[i, j] = BIOME_IDS[biome]
+
+    def _generate_biomes_vectorized(self, rows):
+        """对 self.points 中的所有点批量计算生物群系编号，rows 为各点所在的纬线行号（可广播）"""
+        elevation = self._get_noise_field(0)
+        base_temp = 1.0 - (rows / (self.resolution - 1) - 0.5)**2 * 2
+        temperature = base_temp * 0.7 + self._get_noise_field(1) * 0.3
+        humidity = self._get_noise_field(2)
+        return self._determine_biomes(elevation, temperature, humidity)
 
     def _determine_biome(self, e, t, h):
         if e < 0.3: return "DEEP_OCEAN"
@@ -52,4 +249,20 @@ class PlanetGenerator:
         if t < 0.2: return "SNOW"
         if h < 0.3 and t > 0.6: return "DESERT"
         if h > 0.6 and t > 0.4: return "FOREST"
-        return "GRASSLAND"
\ No newline at end of file
+        return "GRASSLAND"
+
+    def _determine_biomes(self, e, t, h):
+        """_determine_biome 的数组版本，返回 uint8 生物群系编号数组"""
+        # 规则按顺序匹配，与 _determine_biome 的 if 链一致
+        rules = [
+            (e < 0.3, "DEEP_OCEAN"),
+            (e < 0.5, "OCEAN"),
+            (e < 0.53, "BEACH"),
+            (e > 0.8, "MOUNTAIN"),
+            (t < 0.2, "SNOW"),
+            ((h < 0.3) & (t > 0.6), "DESERT"),
+            ((h > 0.6) & (t > 0.4), "FOREST"),
+        ]
+        return np.select([condition for condition, _ in rules],
+                         [BIOME_IDS[biome] for _, biome in rules],
+                         default=BIOME_IDS["GRASSLAND"]).astype(np.uint8)
@@ -1,8 +1,12 @@
+import os
+import time
 import pygame
 from config import *
 from visualizer import Visualizer
-from map_2d_scene import Map2DScene
+from map_2d_scene import Map2DScene, START_CHUNK, get_window_keys, order_by_distance
 from map_2d_generator import Map2DGenerator
+from frame_profiler import profiler
+from frame_scheduler import FrameScheduler, post_wake_event
 
 class SceneManager:
     def __init__(self, planet):
@@ -10,6 +14,17 @@ class SceneManager:
         self.current_scene = SCENE_A
         self.scene_a = None
         self.scene_b = None
+        self.map_generator = None
+        self.speculative_chunks = set()  # 选择瓦片后预先提交生成的初始窗口区块
+        
+        # 上次渲染时的画面状态，用于判断是否需要重绘
+        self.drawn_state = None
+        self.redraw_requested = True  # 窗口被遮挡后重新露出等情况下强制重绘
+        
+        # 帧计时器及其叠加层字体、主循环的帧调度
+        self.profiler = profiler
+        self.profiler_font = pygame.font.Font(None, 22)
+        self.scheduler = FrameScheduler()
         
         # 初始化场景A（球面地图场景）
         self._init_scene_a()
@@ -22,14 +37,36 @@ class SceneManager:
     def _init_scene_b(self, biome_name, selected_tile):
         """初始化场景B（2D地图场景）"""
         if self.scene_b is None:
-            # 创建2D地图生成器
-            map_generator = Map2DGenerator(self.planet)
-            # 创建2D地图场景
-            self.scene_b = Map2DScene(map_generator)
+            # 创建2D地图场景（共用预先生成时创建的区块生成器）
+            self.scene_b = Map2DScene(self._get_map_generator())
             self.scene_b.set_scene_manager(self)
         
-        # 启动2D地图场景
+        # 启动2D地图场景（预先生成的区块由场景接管）
         self.scene_b.start_new_map(biome_name, selected_tile)
+        self.speculative_chunks = set()
+    
+    def _get_map_generator(self):
+        """按需创建2D地图生成器"""
+        if self.map_generator is None:
+            self.map_generator = Map2DGenerator(self.planet)
+            # 后台区块完成时唤醒空闲的主循环
+            self.map_generator.chunk_ready_callback = post_wake_event
+        return self.map_generator
+    
+    def prepare_2d_map(self):
+        """选择瓦片后在后台预先生成2D地图的初始加载窗口，使开始游戏时区块已经就绪
+        
+        新地图总是从 START_CHUNK 开始（与所选瓦片无关），重新选择瓦片时不会重复提交。
+        """
+        map_generator = self._get_map_generator()
+        if not map_generator.async_loading or self.speculative_chunks:
+            # 同步生成会阻塞球面场景，留到开始游戏时再生成；已经提交过时无需再次提交
+            return
+        
+        window_keys = get_window_keys(*START_CHUNK)
+        for chunk_key in order_by_distance(window_keys, *START_CHUNK):
+            map_generator.request_chunk(*chunk_key)
+        self.speculative_chunks = window_keys
     
     def start_2d_map(self, biome_name, selected_tile):
         """从场景A切换到场景B"""
@@ -53,6 +90,16 @@ class SceneManager:
                 print("M键切换：从场景B切换到场景A")
                 self.current_scene = SCENE_A
         
+        # 窗口内容可能已丢失，需要重绘
+        if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+            self.redraw_requested = True
+        
+        # F3 切换帧计时叠加层，F4 导出帧计时 CSV
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            self.profiler.show_overlay = not self.profiler.show_overlay
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+            self._export_profile()
+        
         # 将事件传递给当前场景
         if self.current_scene == SCENE_A:
             if self.scene_a:
@@ -70,14 +117,50 @@ class SceneManager:
             if self.scene_b:
                 self.scene_b.handle_input()
     
+    def needs_redraw(self):
+        """画面自上次渲染以来是否发生了变化
+        
+        显示帧计时叠加层时每帧都重绘，使叠加层上的统计保持更新。
+        """
+        if self.profiler.enabled and self.profiler.show_overlay:
+            return True
+        return self.redraw_requested or self._get_view_state() != self.drawn_state
+    
+    def _get_view_state(self):
+        """当前场景的画面状态以及叠加层开关"""
+        scene = self.scene_a if self.current_scene == SCENE_A else self.scene_b
+        return (self.current_scene, scene.get_view_state() if scene else None, self.profiler.show_overlay)
+    
     def draw(self):
         """绘制当前场景"""
-        if self.current_scene == SCENE_A:
-            if self.scene_a:
-                self.scene_a.draw()
-        elif self.current_scene == SCENE_B:
-            if self.scene_b:
-                self.scene_b.draw()
+        with self.profiler.phase("draw"):
+            if self.current_scene == SCENE_A:
+                if self.scene_a:
+                    self.scene_a.draw()
+            elif self.current_scene == SCENE_B:
+                if self.scene_b:
+                    self.scene_b.draw()
+            # 在场景绘制之后记录（绘制本身会清除场景的重绘标记）
+            self.drawn_state = self._get_view_state()
+            self.redraw_requested = False
+            
+            # 帧计时叠加层画在所有场景内容之上
+            self.profiler.draw_overlay(pygame.display.get_surface(), self.profiler_font,
+                                       footer=self.scheduler.summary())
+        
+        with self.profiler.phase("flip"):
+            pygame.display.flip()
+    
+    def _export_profile(self):
+        """把帧计时历史导出为 CSV"""
+        path = os.path.join(PROFILER_EXPORT_DIR, time.strftime("frames_%Y%m%d_%H%M%S.csv"))
+        frame_count = self.profiler.export_csv(path)
+        print(f"帧计时已导出: {os.path.abspath(path)}（{frame_count} 帧）")
+    
+    def shutdown(self):
+        """退出前释放各场景的后台资源"""
+        if self.map_generator:
+            self.map_generator.shutdown()
     
     @property
     def clock(self):
@@ -2,6 +2,8 @@ import pygame
 import numpy as np
 import math
 from config import *
+from planet_generator import BIOME_PALETTE
+from frame_profiler import profiler
 
 class Visualizer:
     def __init__(self, planet):
@@ -14,11 +16,23 @@ class Visualizer:
         
         # 瓦片选择状态
         self.selected_tile = None  # 选中的瓦片坐标 (row, col)
-        self.selected_region = None  # 选中的区域颜色/生物群系
+        self.selected_region = None  # 选中区域的生物群系编号
         
         # UI状态
         self.button_hovered = False
         self.button_pressed = False
+        self.hovered_tile = None  # 鼠标悬停的瓦片坐标 (row, col)
+        
+        # 按屏幕密度降采样的球面点 (lod_stride, 点坐标, 生物群系编号, 点半径)，只计算一次
+        self.point_lod = None
+        
+        # 光线投射模式的缓存（与视角无关）
+        self.raycast_rays = None
+        self.shaded_palette = None
+        
+        # 缓存的星球画面及其对应的 (视角, 选中瓦片, 绘制模式)
+        self.planet_frame = self.screen.copy()
+        self.planet_frame_key = None
         
         # 字体
         self.font = pygame.font.Font(None, 36)
@@ -55,10 +69,17 @@ class Visualizer:
             if event.button == 1:
                 self.button_pressed = False
     
+    def get_view_state(self):
+        """决定画面内容的状态，与上次渲染时相同则无需重绘"""
+        return (self.angle_x, self.angle_y, self.selected_tile, self.hovered_tile,
+                self.button_hovered, self.button_pressed)
+    
     def _handle_mouse_motion(self, mouse_x, mouse_y):
         """处理鼠标移动事件"""
         # 检查鼠标是否悬停在按钮上
         self.button_hovered = self._is_button_clicked(mouse_x, mouse_y)
+        # 每帧更新鼠标下方的星球瓦片，用于悬停高亮
+        self.hovered_tile = None if self.button_hovered else self._get_tile_at(mouse_x, mouse_y)
     
     def _is_button_clicked(self, mouse_x, mouse_y):
         """检查鼠标是否点击了开始游戏按钮"""
@@ -67,7 +88,20 @@ class Visualizer:
     
     def _handle_planet_click(self, mouse_x, mouse_y):
         """处理点击星球选择区域"""
-        # 计算点击位置相对于星球中心的位置
+        closest_tile = self._get_tile_at(mouse_x, mouse_y)
+        if closest_tile is not None:
+            self.selected_tile = closest_tile
+            self.selected_region = self.planet.biomes[closest_tile[0], closest_tile[1]]
+            # 找到对应的生物群系名称
+            biome_name = self._get_biome_name(self.selected_region)
+            print(f"选择了区域: 坐标({closest_tile[0]}, {closest_tile[1]}), 生物群系: {biome_name}")
+            # 在后台预先生成2D地图的初始区块，缩短开始游戏时的等待
+            if hasattr(self, 'scene_manager'):
+                self.scene_manager.prepare_2d_map()
+    
+    def _get_tile_at(self, mouse_x, mouse_y):
+        """获取屏幕坐标下的星球瓦片，不在星球范围内时返回 None"""
+        # 计算鼠标位置相对于星球中心的位置
         center_x, center_y = SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2
         radius = SCREEN_WIDTH * 0.4
         
@@ -75,65 +109,44 @@ class Visualizer:
         click_x = (mouse_x - center_x) / radius
         click_y = (mouse_y - center_y) / radius
         
-        # 检查点击是否在星球范围内
-        distance_from_center = math.sqrt(click_x**2 + click_y**2)
-        if distance_from_center <= 1.0:
-            # 找到最接近的星球点
-            closest_tile = self._find_closest_planet_tile(click_x, click_y)
-            if closest_tile is not None:
-                self.selected_tile = closest_tile
-                self.selected_region = self.planet.colors[closest_tile[0], closest_tile[1]]
-                # 找到对应的生物群系名称
-                biome_name = self._get_biome_name(self.selected_region)
-                print(f"选择了区域: 坐标({closest_tile[0]}, {closest_tile[1]}), 生物群系: {biome_name}")
+        # 检查是否在星球范围内
+        if click_x**2 + click_y**2 > 1.0:
+            return None
+        return self._find_closest_planet_tile(click_x, click_y)
     
     def _find_closest_planet_tile(self, click_x, click_y):
-        """找到最接近点击位置的星球瓦片"""
-        # 计算旋转矩阵
-        rot_x = np.array([[1,0,0],[0,math.cos(self.angle_x),-math.sin(self.angle_x)],[0,math.sin(self.angle_x),math.cos(self.angle_x)]])
-        rot_y = np.array([[math.cos(self.angle_y),0,math.sin(self.angle_y)],[0,1,0],[-math.sin(self.angle_y),0,math.cos(self.angle_y)]])
-        rotation_matrix = rot_y @ rot_x
-        
-        # 旋转所有点
-        rotated_points = self.planet.points.reshape(-1, 3) @ rotation_matrix.T
-        
-        # 找到朝向我们的点
-        front_face_indices = np.where(rotated_points[:, 2] > 0)[0]
-        
-        if len(front_face_indices) == 0:
-            return None
-        
-        # 计算投影坐标
-        center_x, center_y = SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2
-        radius = SCREEN_WIDTH * 0.4
-        
-        min_distance = float('inf')
-        closest_tile = None
-        
-        for i in front_face_indices:
-            point = rotated_points[i]
-            x_proj = point[0] * radius + center_x
-            y_proj = point[1] * radius + center_y
-            
-            # 计算距离
-            distance = math.sqrt((x_proj - (click_x * radius + center_x))**2 + 
-                               (y_proj - (click_y * radius + center_y))**2)
-            
-            if distance < min_distance:
-                min_distance = distance
-                # 将一维索引转换回二维坐标
-                row = i // self.planet.resolution
-                col = i % self.planet.resolution
-                closest_tile = (row, col)
-        
-        return closest_tile
+        """找到最接近点击位置的星球瓦片：反求投影和旋转，直接得到经纬度"""
+        # 点击位置在可见半球上的点 r = R p，反求旋转前的球面点 p = R^T r
+        click_z = math.sqrt(max(0.0, 1.0 - click_x**2 - click_y**2))
+        point = self._get_rotation_matrix().T @ np.array([click_x, click_y, click_z])
+        rows, cols = self._points_to_tiles(point[:, None])
+        return int(rows[0]), int(cols[0])
     
-    def _get_biome_name(self, color):
-        """根据颜色获取生物群系名称"""
-        for biome, biome_color in BIOME_COLORS.items():
-            if np.array_equal(color, biome_color):
-                return BIOME_NAMES.get(biome, "Unknown")
-        return "Unknown"
+    def _points_to_tiles(self, points):
+        """把单位球面上的点 (3, N) 映射到最近的经纬度网格瓦片，返回 (rows, cols)"""
+        rows, lons = self._points_to_rows(points)
+        if self.planet.layout is not None:
+            # 等面积采样：直接吸附到该纬线上最近的采样点，避免先取整到网格列再映射带来的二次误差
+            return rows, self.planet.layout.snap_lons_to_cols(rows, lons)
+        resolution = self.planet.resolution
+        lon_step = 2 * np.pi / (resolution - 1)
+        cols = np.clip(np.rint((lons + np.pi) / lon_step).astype(np.int32), 0, resolution - 1)
+        return rows, cols
+    
+    def _points_to_rows(self, points):
+        """单位球面上的点 (3, N) 所在的网格行（与 PlanetGenerator.generate 相同的纬线）及其经度"""
+        lats = np.arcsin(np.clip(points[2], -1.0, 1.0))
+        lons = np.arctan2(points[1], points[0])
+        resolution = self.planet.resolution
+        lat_step = np.pi / (resolution - 1)
+        rows = np.clip(np.rint((lats + np.pi / 2) / lat_step).astype(np.int32), 0, resolution - 1)
+        return rows, lons
+    
+    def _get_biome_name(self, biome_id):
+        """根据生物群系编号获取生物群系名称"""
+        if biome_id is None or not 0 <= biome_id < len(BIOME_KEYS):
+            return "Unknown"
+        return BIOME_NAMES.get(BIOME_KEYS[biome_id], "Unknown")
     
     def _start_game(self):
         """开始游戏，切换到场景B"""
@@ -151,27 +164,231 @@ class Visualizer:
         """设置场景管理器"""
         self.scene_manager = scene_manager
 
-    def draw(self):
-        self.screen.fill((10, 10, 20))
-
+    def _get_rotation_matrix(self):
+        """当前视角的旋转矩阵"""
         rot_x = np.array([[1,0,0],[0,math.cos(self.angle_x),-math.sin(self.angle_x)],[0,math.sin(self.angle_x),math.cos(self.angle_x)]])
         rot_y = np.array([[math.cos(self.angle_y),0,math.sin(self.angle_y)],[0,1,0],[-math.sin(self.angle_y),0,math.cos(self.angle_y)]])
-        rotation_matrix = rot_y @ rot_x
+        return rot_y @ rot_x
+    
+    def _get_point_radius(self):
+        """动态计算点的半径（按降采样后的分辨率）"""
+        return self._get_point_lod()[3]
+    
+    def _get_point_lod(self):
+        """按投影后的点间距选择降采样步长，返回 (步长, 点坐标 (N, 3), 生物群系编号 (N,), 点半径)
+        
+        相邻纬线在圆盘中心处的屏幕间距小于 PLANET_LOD_MIN_POINT_SPACING 像素时，
+        每隔若干行、列取一个点，使绘制的点数不随行星分辨率增长。
+        """
+        if self.point_lod is None:
+            resolution = self.planet.resolution
+            radius = SCREEN_WIDTH * 0.4
+            point_spacing = radius * math.pi / (resolution - 1)
+            stride = max(1, math.ceil(PLANET_LOD_MIN_POINT_SPACING / point_spacing))
+            
+            points, biomes = self.planet.get_samples(stride)
+            lod_resolution = len(range(0, resolution, stride))
+            
+            # 经验值：屏幕宽度除以分辨率得到的格子大小的一半，再稍微放大一点；确保半径至少为1
+            point_radius = max(1, int((SCREEN_WIDTH / lod_resolution) * 0.75))
+            self.point_lod = (stride, points, biomes, point_radius)
+        return self.point_lod
+
+    def draw(self):
+        # 星球画面只在视角、选中瓦片或绘制模式变化时重新渲染，其余帧直接复用
+        frame_key = (self.angle_x, self.angle_y, self.selected_tile,
+                     PLANET_RENDER_MODE, VECTORIZED_PLANET_RENDERING)
+        with profiler.phase("planet"):
+            if frame_key != self.planet_frame_key:
+                self._render_planet()
+                self.planet_frame_key = frame_key
+            self.screen.blit(self.planet_frame, (0, 0))
+
+        # 悬停高亮和UI元素每帧叠加在缓存的星球画面上
+        with profiler.phase("ui"):
+            self._draw_hovered_tile(self._get_point_radius())
+            self._draw_ui()
+    
+    def _render_planet(self):
+        """把星球渲染到缓存的 planet_frame 表面"""
+        self.planet_frame.fill(PLANET_BACKGROUND_COLOR)
+
+        if PLANET_RENDER_MODE == "raycast":
+            self._draw_planet_raycast()
+        elif VECTORIZED_PLANET_RENDERING:
+            self._draw_planet_vectorized()
+        else:
+            self._draw_planet_points()
+    
+    def _draw_planet_vectorized(self):
+        """批量绘制星球：光照、着色和投影按整个数组计算，再把所有点一次性写入像素缓冲区"""
+        rotation_matrix = self._get_rotation_matrix()
+        _, lod_points, flat_biomes, point_radius = self._get_point_lod()
+        rotated_points = lod_points @ rotation_matrix.T.astype(np.float32)
+
+        center_x, center_y = SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2
+        radius = SCREEN_WIDTH * 0.4
+
+        # 投影坐标；圆完全在屏幕外的点直接丢弃
+        x_proj = (rotated_points[:, 0] * radius + center_x).astype(np.int32)
+        y_proj = (rotated_points[:, 1] * radius + center_y).astype(np.int32)
+        visible = ((rotated_points[:, 2] > 0) &
+                   (x_proj > -point_radius) & (x_proj < SCREEN_WIDTH + point_radius) &
+                   (y_proj > -point_radius) & (y_proj < SCREEN_HEIGHT + point_radius))
+
+        # 由远及近排序，近处的点覆盖远处的点
+        indices = np.flatnonzero(visible)
+        indices = indices[np.argsort(rotated_points[indices, 2], kind="stable")]
+
+        # 简单光照：法向量就是点的坐标，光源方向为 (0, 0, 1)
+        intensity = np.clip(rotated_points[indices, 2], 0.15, 1.0)
+        lit_colors = (BIOME_PALETTE[flat_biomes[indices]] * intensity[:, None]).astype(np.uint8)
+
+        # 在四周留出边距的缓冲区内记录每个像素由哪个点覆盖（按远近排序后的序号），
+        # 缓冲区按行存储，与屏幕表面的内存布局一致；圆心最多在屏幕外一个半径处，圆盘再延伸一个半径
+        margin = 2 * point_radius
+        buffer_width = SCREEN_WIDTH + 2 * margin
+        buffer_height = SCREEN_HEIGHT + 2 * margin
+        owner = np.full(buffer_width * buffer_height, -1, dtype=np.int32)
+        centers = ((y_proj[indices] + margin) * buffer_width + (x_proj[indices] + margin)).astype(np.int32)
+        disc_offsets = self._get_disc_offsets(point_radius, buffer_width)
+        # 一次性写入所有圆盘覆盖的像素；序号越大越近，同一像素被多个点覆盖时取最大的序号。
+        # 用 maximum.at 显式取最大值：花式索引赋值遇到重复下标时，NumPy 不保证哪一次写入生效
+        np.maximum.at(owner, (centers[:, None] + disc_offsets[None, :]).ravel(),
+                      np.repeat(np.arange(len(indices), dtype=np.int32), len(disc_offsets)))
+
+        # 颜色打包成屏幕像素格式，末尾追加背景色供未覆盖的像素（序号 -1）使用
+        packed_colors = np.append(self._pack_colors(lit_colors),
+                                  np.uint32(self.planet_frame.map_rgb(PLANET_BACKGROUND_COLOR)))
+
+        # 按覆盖关系取颜色，只把星球所在的矩形区域直接写入屏幕像素
+        left = max(0, int(x_proj[indices].min()) - point_radius) if len(indices) else 0
+        right = min(SCREEN_WIDTH, int(x_proj[indices].max()) + point_radius + 1) if len(indices) else 0
+        owner = owner.reshape(buffer_height, buffer_width)[margin:margin + SCREEN_HEIGHT,
+                                                           margin + left:margin + right]
+        screen_pixels = pygame.surfarray.pixels2d(self.planet_frame)
+        screen_pixels[left:right].T[...] = np.take(packed_colors, owner)
+        del screen_pixels
+
+        self._draw_selected_tile(rotation_matrix, point_radius)
+
+    def _draw_planet_raycast(self):
+        """逐像素绘制星球：把生物群系网格当作等距柱状投影纹理，对圆盘内每个像素反求球面坐标后采样"""
+        left, right, inside, rays, shade = self._get_raycast_rays()
+        rotation_matrix = self._get_rotation_matrix()
+
+        # 屏幕上的交点 r = R p，反求旋转前的球面点 p = R^T r
+        points = rotation_matrix.T.astype(np.float32) @ rays
+        if self.planet.layout is None:
+            rows, cols = self._points_to_tiles(points)
+            biomes = np.take(self.planet.biomes, rows * self.planet.resolution + cols).astype(np.int32)
+        else:
+            # 等面积采样：直接取最近采样点的生物群系
+            rows, lons = self._points_to_rows(points)
+            biomes = np.take(self.planet.sample_biomes, self.planet.layout.lons_to_samples(rows, lons)).astype(np.int32)
+
+        # 光照只与像素位置有关，按 (生物群系, 亮度级别) 查预先打包好的颜色
+        pixels = np.full(inside.shape, self.planet_frame.map_rgb(PLANET_BACKGROUND_COLOR), dtype=np.uint32)
+        pixels[inside] = np.take(self._get_shaded_palette(), biomes * SHADE_LEVELS + shade)
+        screen_pixels = pygame.surfarray.pixels2d(self.planet_frame)
+        screen_pixels[left:right].T[...] = pixels
+        del screen_pixels
+
+        self._draw_selected_tile(rotation_matrix, self._get_point_radius())
+
+    def _get_raycast_rays(self):
+        """圆盘内每个像素对应的旋转后球面点及其亮度级别（与视角无关，只计算一次）"""
+        if self.raycast_rays is None:
+            center_x, center_y = SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2
+            radius = SCREEN_WIDTH * 0.4
+            left = max(0, int(center_x - radius))
+            right = min(SCREEN_WIDTH, int(math.ceil(center_x + radius)))
+
+            # 像素中心反投影到单位圆盘上
+            x = ((np.arange(left, right) + 0.5 - center_x) / radius).astype(np.float32)
+            y = ((np.arange(SCREEN_HEIGHT) + 0.5 - center_y) / radius).astype(np.float32)
+            inside = x[None, :] ** 2 + y[:, None] ** 2 < 1.0
+            row_indices, col_indices = np.nonzero(inside)
+            ray_x = x[col_indices]
+            ray_y = y[row_indices]
+            ray_z = np.sqrt(1.0 - ray_x * ray_x - ray_y * ray_y)
+
+            # 简单光照：法向量就是点的坐标，光源方向为 (0, 0, 1)
+            shade = np.rint(np.clip(ray_z, 0.15, 1.0) * (SHADE_LEVELS - 1)).astype(np.int32)
+            self.raycast_rays = (left, right, inside, np.stack([ray_x, ray_y, ray_z]), shade)
+        return self.raycast_rays
+
+    def _get_shaded_palette(self):
+        """各生物群系在每个亮度级别下的颜色，已打包成屏幕像素格式"""
+        if self.shaded_palette is None:
+            levels = np.arange(SHADE_LEVELS) / (SHADE_LEVELS - 1)
+            shaded = (BIOME_PALETTE[:, None, :] * levels[None, :, None]).astype(np.uint8)
+            self.shaded_palette = self._pack_colors(shaded.reshape(-1, 3))
+        return self.shaded_palette
+
+    def _pack_colors(self, colors):
+        """把 (N, 3) 的 RGB 颜色打包成屏幕表面的像素值"""
+        shifts = self.planet_frame.get_shifts()
+        return ((colors[:, 0].astype(np.uint32) << shifts[0]) |
+                (colors[:, 1].astype(np.uint32) << shifts[1]) |
+                (colors[:, 2].astype(np.uint32) << shifts[2]))
+
+    def _draw_selected_tile(self, rotation_matrix, point_radius):
+        """选中瓦片用白色高亮显示"""
+        if self.selected_tile is None:
+            return
+        row, col = self.selected_tile
+        point = self.planet.get_tile_point(row, col) @ rotation_matrix.T
+        if point[2] <= 0:
+            return
+        intensity = max(0.15, min(1.0, point[2]))
+        base_color = BIOME_PALETTE[self.planet.biomes[row, col]]
+        lit_color = tuple(int(c * intensity) for c in base_color)
+        self._draw_selected_point(self._project_point(point), lit_color, point_radius)
+
+    def _draw_hovered_tile(self, point_radius):
+        """鼠标悬停的瓦片用细白圈标出"""
+        if self.hovered_tile is None or self.hovered_tile == self.selected_tile:
+            return
+        row, col = self.hovered_tile
+        point = self.planet.get_tile_point(row, col) @ self._get_rotation_matrix().T
+        if point[2] > 0:
+            pygame.draw.circle(self.screen, (255, 255, 255), self._project_point(point), point_radius + 2, 1)
+
+    def _project_point(self, point):
+        """旋转后的球面点在屏幕上的投影坐标"""
+        center_x, center_y = SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2
+        radius = SCREEN_WIDTH * 0.4
+        return (int(point[0] * radius + center_x), int(point[1] * radius + center_y))
+
+    def _get_disc_offsets(self, point_radius, buffer_width):
+        """圆盘内各像素相对圆心在按行展平的缓冲区中的偏移"""
+        span = np.arange(-point_radius, point_radius + 1)
+        dy, dx = np.meshgrid(span, span, indexing="ij")
+        inside = dx * dx + dy * dy <= point_radius * point_radius
+        return (dy[inside] * buffer_width + dx[inside]).astype(np.int32)
+
+    def _draw_selected_point(self, position, lit_color, point_radius):
+        """绘制选中瓦片的高亮"""
+        # 绘制更大的白色圆作为高亮背景
+        pygame.draw.circle(self.planet_frame, (255, 255, 255), position, point_radius + 3)
+        # 绘制原始颜色的圆
+        pygame.draw.circle(self.planet_frame, lit_color, position, point_radius)
+        # 绘制白色边框
+        pygame.draw.circle(self.planet_frame, (255, 255, 255), position, point_radius + 2, 3)
+    
+    def _draw_planet_points(self):
+        """逐点绘制星球"""
+        rotation_matrix = self._get_rotation_matrix()
         
         light_source = np.array([0, 0, 1])
 
         # 批量旋转所有点，这比在循环中逐个旋转快得多
-        rotated_points = self.planet.points.reshape(-1, 3) @ rotation_matrix.T
-        flat_colors = self.planet.colors.reshape(-1, 3)
+        _, lod_points, flat_biomes, point_radius = self._get_point_lod()
+        rotated_points = lod_points @ rotation_matrix.T
 
         # 找到所有朝向我们的点
         front_face_indices = np.where(rotated_points[:, 2] > 0)[0]
-        
-        # 动态计算点的半径
-        # 经验值：屏幕宽度除以分辨率得到的格子大小的一半，再稍微放大一点
-        point_radius = int((SCREEN_WIDTH / self.planet.resolution) * 0.75)
-        # 确保半径至少为1
-        point_radius = max(1, point_radius) 
 
         center_x, center_y = SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2
         radius = SCREEN_WIDTH * 0.4
@@ -181,12 +398,12 @@ class Visualizer:
             
             # 应用简单的光照
             # 我们用点的原始法向量（就是它的坐标）来计算光照
-            original_normal = self.planet.points.reshape(-1, 3)[i]
+            original_normal = lod_points[i]
             rotated_normal = original_normal @ rotation_matrix.T
             intensity = np.dot(rotated_normal, light_source)
             intensity = max(0.15, min(1.0, intensity))
 
-            base_color = flat_colors[i]
+            base_color = BIOME_PALETTE[flat_biomes[i]]
             lit_color = (
                 min(255, int(base_color[0] * intensity)),
                 min(255, int(base_color[1] * intensity)),
@@ -196,29 +413,10 @@ class Visualizer:
             # 投影坐标
             x_proj = int(point[0] * radius + center_x)
             y_proj = int(point[1] * radius + center_y)
-            
-            # 检查是否是选中的瓦片
-            row = i // self.planet.resolution
-            col = i % self.planet.resolution
-            is_selected = (self.selected_tile is not None and 
-                          row == self.selected_tile[0] and 
-                          col == self.selected_tile[1])
-            
-            if is_selected:
-                # 选中瓦片用白色高亮显示
-                # 绘制更大的白色圆作为高亮背景
-                pygame.draw.circle(self.screen, (255, 255, 255), (x_proj, y_proj), point_radius + 3)
-                # 绘制原始颜色的圆
-                pygame.draw.circle(self.screen, lit_color, (x_proj, y_proj), point_radius)
-                # 绘制白色边框
-                pygame.draw.circle(self.screen, (255, 255, 255), (x_proj, y_proj), point_radius + 2, 3)
-            else:
-                pygame.draw.circle(self.screen, lit_color, (x_proj, y_proj), point_radius)
-
-        # 绘制UI元素
-        self._draw_ui()
-
-        pygame.display.flip()
+            pygame.draw.circle(self.planet_frame, lit_color, (x_proj, y_proj), point_radius)
+        
+        # 选中的瓦片不一定在降采样后的点中，单独绘制在最上层
+        self._draw_selected_tile(rotation_matrix, point_radius)
     
     def _draw_ui(self):
         """绘制用户界面元素"""
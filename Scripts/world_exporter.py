@@ -0,0 +1,223 @@
+"""无显示环境下的2D世界导出工具
+
+在所有 CPU 核心上并行生成一片 N x M 区块的区域，并写出 z/x/y 结构的 PNG 瓦片金字塔，
+可以用任意 slippy map 查看器（Leaflet、OpenLayers 等）浏览：
+    - 最高缩放级别的每张瓦片对应一个区块，一个像素即一个地图瓦片
+    - 每降低一级，2x2 张瓦片合并为一张，每个像素取 2x2 范围内出现最多的瓦片类型
+    - 瓦片保存为 8 位调色板 PNG，颜色为 TILE_TYPES，区域外为 MAP_BACKGROUND_COLOR
+
+已存在的瓦片会被跳过，中断后重新运行同一命令即可继续导出；删除部分瓦片后重新运行，
+只会重新生成这些瓦片，并重建比任一子瓦片更旧的上级瓦片。
+
+用法:
+    python Scripts/world_exporter.py --seed 42                       # 以 (0, 0) 为中心导出 16x16 个区块
+    python Scripts/world_exporter.py --seed 42 -W 64 -H 32 -x 0 -y 0  # 指定区域的大小和左上角区块
+    python Scripts/world_exporter.py --seed 42 -o tiles -j 4          # 指定输出目录和进程数
+"""
+import os
+
+# 必须在导入 pygame 之前设置
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import math
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pygame
+
+from config import *
+from planet_generator import PlanetGenerator, PLANET_GENERATOR_VERSION
+import map_2d_generator
+from map_2d_generator import (_init_chunk_worker, downsample_tile_types, expand_chunk,
+                              CHUNK_GENERATOR_VERSION)
+
+# 瓦片调色板：瓦片类型编号即 TILE_TYPES 中的顺序，最后一项是区域外的背景
+TILE_PALETTE = list(TILE_TYPES.values()) + [MAP_BACKGROUND_COLOR]
+BACKGROUND_INDEX = len(TILE_TYPES)
+
+MANIFEST_NAME = "world.json"
+PROGRESS_INTERVAL = 2.0  # 进度输出的最小间隔（秒）
+
+
+def _export_chunk_tile(chunk_x, chunk_y, path):
+    """在工作进程中生成区块并写出最高缩放级别的瓦片（生成器由 _init_chunk_worker 创建）"""
+    chunk_data = map_2d_generator._worker_generator.generate_chunk(chunk_x, chunk_y)
+    _save_tile(expand_chunk(chunk_data), path)
+
+
+def _export_parent_tile(child_paths, path):
+    """由四张子瓦片（左上、右上、左下、右下，不存在时为 None）合并出上一级瓦片"""
+    tiles = np.full((2 * CHUNK_SIZE, 2 * CHUNK_SIZE), BACKGROUND_INDEX, dtype=np.uint8)
+    for i, child_path in enumerate(child_paths):
+        if child_path is not None:
+            x, y = (i % 2) * CHUNK_SIZE, (i // 2) * CHUNK_SIZE
+            tiles[x:x + CHUNK_SIZE, y:y + CHUNK_SIZE] = _load_tile(child_path)
+    # 背景也作为一种类型参与众数
+    _save_tile(downsample_tile_types(tiles, len(TILE_PALETTE)), path)
+
+
+def _save_tile(tiles, path):
+    """把瓦片类型数组（下标为 [x, y]）写成 8 位调色板 PNG；先写临时文件再替换，中断时不会留下不完整的瓦片"""
+    surface = pygame.Surface(tiles.shape, depth=8)
+    surface.set_palette(TILE_PALETTE)
+    pygame.surfarray.blit_array(surface, tiles)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = os.path.splitext(path)[0] + ".tmp.png"
+    pygame.image.save(surface, temp_path)
+    os.replace(temp_path, path)
+
+
+def _load_tile(path):
+    """读取 _save_tile 写出的瓦片，返回瓦片类型数组"""
+    return pygame.surfarray.array2d(pygame.image.load(path)).astype(np.uint8)
+
+
+def _is_stale(path, source_paths):
+    """瓦片不存在，或比任一来源瓦片旧（来源在上次合并之后被重新生成）"""
+    if not os.path.exists(path):
+        return True
+    mtime = os.stat(path).st_mtime_ns
+    return any(os.stat(source_path).st_mtime_ns > mtime for source_path in source_paths)
+
+
+class WorldExporter:
+    """把一片区块区域导出为 z/x/y 瓦片金字塔"""
+
+    def __init__(self, planet, output_dir, origin_x, origin_y, width, height, workers):
+        self.planet = planet
+        self.output_dir = output_dir
+        self.origin_x, self.origin_y = origin_x, origin_y
+        self.width, self.height = width, height
+        self.workers = workers
+        # 最高缩放级别：一张瓦片一个区块，2^max_zoom 张瓦片覆盖整个区域
+        self.max_zoom = max(0, math.ceil(math.log2(max(width, height))))
+
+    def get_manifest(self):
+        """描述导出内容的元数据；继续导出时必须与已有的一致"""
+        return {
+            "seed": self.planet.seed,
+            "resolution": self.planet.resolution,
+            "sampling": self.planet.sampling,
+            "planet_generator_version": PLANET_GENERATOR_VERSION,
+            "chunk_generator_version": CHUNK_GENERATOR_VERSION,
+            "vectorized": VECTORIZED_CHUNK_GENERATION,
+            "origin": [self.origin_x, self.origin_y],
+            "size": [self.width, self.height],
+            "max_zoom": self.max_zoom,
+            "tile_size": CHUNK_SIZE,
+        }
+
+    def tile_path(self, zoom, x, y):
+        return os.path.join(self.output_dir, str(zoom), str(x), f"{y}.png")
+
+    def check_manifest(self):
+        """写入元数据；输出目录中已有其他参数的导出时返回 False"""
+        manifest = self.get_manifest()
+        manifest_path = os.path.join(self.output_dir, MANIFEST_NAME)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as manifest_file:
+                if json.load(manifest_file) != manifest:
+                    return False
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(manifest_path, "w", encoding="utf-8") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
+        return True
+
+    def run(self):
+        """导出全部瓦片，返回统计信息"""
+        stats = {"chunks": self.width * self.height}
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_chunk_worker,
+                                 initargs=(self.planet, VECTORIZED_CHUNK_GENERATION)) as executor:
+            # 最高缩放级别：每张瓦片生成一个区块
+            jobs = [(_export_chunk_tile, self.origin_x + x, self.origin_y + y, self.tile_path(self.max_zoom, x, y))
+                    for x in range(self.width) for y in range(self.height)]
+            jobs = [job for job in jobs if not os.path.exists(job[-1])]
+            start = time.perf_counter()
+            stats["generated"] = self._run_jobs(executor, jobs, "区块")
+            stats["chunk_seconds"] = time.perf_counter() - start
+            stats["skipped"] = stats["chunks"] - stats["generated"]
+
+            # 逐级向上合并，每一级依赖下一级已全部写出
+            stats["pyramid_tiles"] = 0
+            start = time.perf_counter()
+            for zoom in range(self.max_zoom - 1, -1, -1):
+                stats["pyramid_tiles"] += self._run_jobs(executor, self._get_parent_jobs(zoom), f"z{zoom} 瓦片")
+            stats["pyramid_seconds"] = time.perf_counter() - start
+        return stats
+
+    def _get_parent_jobs(self, zoom):
+        """缩放级别 zoom 上需要（重新）合并的瓦片：至少有一张子瓦片在区域内，且尚未写出或比某张子瓦片旧"""
+        scale = 2 ** (self.max_zoom - zoom)
+        jobs = []
+        for x in range(math.ceil(self.width / scale)):
+            for y in range(math.ceil(self.height / scale)):
+                child_paths = []
+                for child_y in (2 * y, 2 * y + 1):
+                    for child_x in (2 * x, 2 * x + 1):
+                        child_path = self.tile_path(zoom + 1, child_x, child_y)
+                        child_paths.append(child_path if os.path.exists(child_path) else None)
+                path = self.tile_path(zoom, x, y)
+                if _is_stale(path, [child_path for child_path in child_paths if child_path is not None]):
+                    jobs.append((_export_parent_tile, child_paths, path))
+        return jobs
+
+    def _run_jobs(self, executor, jobs, label):
+        """并行执行任务，返回执行的任务数"""
+        if not jobs:
+            return 0
+        start = last_report = time.perf_counter()
+        futures = [executor.submit(*job) for job in jobs]
+        for done, future in enumerate(as_completed(futures), 1):
+            future.result()
+            now = time.perf_counter()
+            if now - last_report >= PROGRESS_INTERVAL or done == len(futures):
+                last_report = now
+                print(f"  {label}: {done}/{len(futures)}  {done / (now - start):.1f} 个/秒")
+        return len(futures)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="并行生成一片区块区域并导出为 z/x/y PNG 瓦片金字塔")
+    parser.add_argument("--seed", type=int, required=True, help="行星种子")
+    parser.add_argument("--resolution", type=int, default=RESOLUTION, help=f"行星分辨率（默认 {RESOLUTION}）")
+    parser.add_argument("-W", "--width", type=int, default=16, help="区域宽度（区块数，默认 16）")
+    parser.add_argument("-H", "--height", type=int, default=16, help="区域高度（区块数，默认 16）")
+    parser.add_argument("-x", "--origin-x", type=int, help="区域左上角的区块 X 坐标（默认使区域以 (0, 0) 为中心）")
+    parser.add_argument("-y", "--origin-y", type=int, help="区域左上角的区块 Y 坐标（默认使区域以 (0, 0) 为中心）")
+    parser.add_argument("-o", "--output", help="输出目录（默认 cache/tiles/seed<种子>）")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="工作进程数（默认为 CPU 核心数）")
+    args = parser.parse_args(argv)
+    if args.width < 1 or args.height < 1:
+        parser.error("区域的宽度和高度至少为 1 个区块")
+
+    origin_x = -(args.width // 2) if args.origin_x is None else args.origin_x
+    origin_y = -(args.height // 2) if args.origin_y is None else args.origin_y
+    output_dir = args.output or os.path.join(WORLD_EXPORT_DIR, f"seed{args.seed}")
+
+    planet = PlanetGenerator(resolution=args.resolution, seed=args.seed)
+    planet.load_or_generate()
+
+    exporter = WorldExporter(planet, output_dir, origin_x, origin_y, args.width, args.height, args.workers)
+    if not exporter.check_manifest():
+        print(f"{output_dir} 中已有参数不同的导出，请换一个输出目录")
+        return 2
+
+    print(f"导出区块 ({origin_x}, {origin_y}) 起 {args.width}x{args.height} 个区块，"
+          f"缩放级别 0-{exporter.max_zoom}，{args.workers} 个进程 -> {os.path.abspath(output_dir)}")
+    stats = exporter.run()
+
+    chunk_rate = stats["generated"] / stats["chunk_seconds"] if stats["generated"] else 0.0
+    print(f"区块: 生成 {stats['generated']}，跳过 {stats['skipped']}，"
+          f"用时 {stats['chunk_seconds']:.1f} 秒（{chunk_rate:.1f} 区块/秒）")
+    print(f"金字塔: 写出 {stats['pyramid_tiles']} 张瓦片，用时 {stats['pyramid_seconds']:.1f} 秒")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
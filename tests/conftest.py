@@ -0,0 +1,20 @@
+import os
+import sys
+
+# 模块位于 Scripts/ 下并以扁平方式互相导入（from config import *）
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Scripts"))
+
+# 无显示环境下运行，必须在导入 pygame 之前设置
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def small_planet():
+    """小分辨率的行星（不读写磁盘缓存）"""
+    from planet_generator import PlanetGenerator
+    planet = PlanetGenerator(resolution=24, seed=7)
+    planet.generate()
+    return planet
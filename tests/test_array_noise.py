@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+import array_noise
+
+noise = pytest.importorskip("noise")
+
+# 覆盖负坐标、整数格点和跨越 repeat 边界的坐标
+COORDS = np.concatenate([np.linspace(-37.3, 41.9, 23), [0.0, 1.0, -1.0, 255.5, 1023.75, 1024.25]])
+
+
+@pytest.mark.parametrize("octaves", [1, 2, 6])
+def test_pnoise2_matches_noise_library(octaves):
+    x, y = COORDS[:, None], COORDS[None, :] * 0.731
+    expected = np.array([[noise.pnoise2(float(xv), float(yv), octaves=octaves) for yv in y[0]] for xv in x[:, 0]],
+                        dtype=np.float32)
+    np.testing.assert_array_equal(array_noise.pnoise2(x, y, octaves=octaves), expected)
+
+
+@pytest.mark.parametrize("octaves", [1, 6])
+def test_pnoise3_matches_noise_library(octaves):
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-4.0, 4.0, size=(500, 3))
+    expected = np.array([noise.pnoise3(*map(float, point), octaves=octaves, persistence=0.5, lacunarity=2.0)
+                         for point in points], dtype=np.float32)
+    result = array_noise.pnoise3(points[:, 0], points[:, 1], points[:, 2],
+                                 octaves=octaves, persistence=0.5, lacunarity=2.0)
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_pnoise2_repeat_matches_noise_library():
+    x = np.linspace(-20.0, 20.0, 41)
+    expected = np.array([noise.pnoise2(float(v), float(v) * 0.5, repeatx=8, repeaty=16) for v in x],
+                        dtype=np.float32)
+    np.testing.assert_array_equal(array_noise.pnoise2(x, x * 0.5, repeatx=8, repeaty=16), expected)
+
+
+@pytest.mark.parametrize("base", [5, 1000])
+def test_pnoise2_base_is_not_wrapped(base):
+    # 每个 base 都应得到不同的噪声（而不是 base % 256）
+    x = np.linspace(0.0, 20.0, 50)
+    fields = [array_noise.pnoise2(x[:, None], x[None, :], octaves=2, base=b) for b in (base, base + 256, base + 512)]
+    assert not np.array_equal(fields[0], fields[1])
+    assert not np.array_equal(fields[0], fields[2])
+    assert not np.array_equal(fields[1], fields[2])
+
+
+@pytest.mark.parametrize("base", [5, 1000])
+def test_pnoise3_base_is_not_wrapped(base):
+    points = np.random.default_rng(2).uniform(-2.0, 2.0, size=(400, 3))
+    fields = [array_noise.pnoise3(points[:, 0], points[:, 1], points[:, 2], octaves=3, base=b)
+              for b in (base, base + 256, base + 512)]
+    assert not np.array_equal(fields[0], fields[1])
+    assert not np.array_equal(fields[0], fields[2])
+    assert not np.array_equal(fields[1], fields[2])
+
+
+def test_base_offsets_stay_in_range():
+    # base > 0 时 C 实现越界读取，数组版循环取置换表：结果不与 noise 库比较，只要求有界且确定
+    x = np.linspace(-10.0, 10.0, 101)
+    first = array_noise.pnoise2(x[:, None], x[None, :], octaves=4, base=977)
+    np.testing.assert_array_equal(first, array_noise.pnoise2(x[:, None], x[None, :], octaves=4, base=977))
+    assert np.all(np.abs(first) <= 1.0)
+
+
+def test_octaves_must_be_positive():
+    with pytest.raises(ValueError):
+        array_noise.pnoise2(0.0, 0.0, octaves=0)
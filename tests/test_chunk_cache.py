@@ -0,0 +1,74 @@
+import numpy as np
+
+from chunk_cache import ChunkCache
+
+
+def _chunk(nbytes):
+    return np.zeros(nbytes, dtype=np.uint8)
+
+
+def test_evicts_least_recently_used_entry():
+    cache = ChunkCache(max_entries=2)
+    cache.put((0, 0), _chunk(1))
+    cache.put((1, 0), _chunk(1))
+    cache.get((0, 0))  # (1, 0) 变为最久未使用
+    cache.put((2, 0), _chunk(1))
+    assert (0, 0) in cache and (2, 0) in cache
+    assert (1, 0) not in cache
+    assert cache.evictions == 1
+
+
+def test_byte_budget_evicts_until_within_budget():
+    cache = ChunkCache(max_bytes=100)
+    cache.put((0, 0), _chunk(40))
+    cache.put((1, 0), _chunk(40))
+    cache.put((2, 0), _chunk(50))
+    assert (0, 0) not in cache
+    assert cache.total_bytes == 90
+    cache.put((3, 0), _chunk(100))
+    assert len(cache) == 1 and cache.total_bytes == 100
+    assert cache.evictions == 3
+
+
+def test_replacing_entry_updates_byte_count():
+    cache = ChunkCache(max_bytes=100)
+    cache.put((0, 0), _chunk(60))
+    cache.put((0, 0), _chunk(10))
+    assert cache.total_bytes == 10
+    cache.put((1, 0), np.uint8(3))  # 单一瓦片类型的标量区块
+    assert cache.total_bytes == 11
+
+
+def test_pinned_entries_are_never_evicted():
+    cache = ChunkCache(max_entries=2)
+    cache.put((0, 0), _chunk(1))
+    cache.put((1, 0), _chunk(1))
+    cache.set_pinned([(0, 0), (1, 0)])
+    cache.put((2, 0), _chunk(1))
+    # 固定的区块即使最久未使用也保留，新放入的未固定区块被淘汰
+    assert (0, 0) in cache and (1, 0) in cache and (2, 0) not in cache
+
+    # 固定的区块超出预算时暂时保留，解除固定后立即按 LRU 淘汰
+    cache.set_pinned([(0, 0), (1, 0), (2, 0)])
+    cache.put((2, 0), _chunk(1))
+    assert len(cache) == 3
+    cache.set_pinned([(2, 0)])
+    assert len(cache) == 2 and (0, 0) not in cache and (2, 0) in cache
+
+
+def test_stats_count_hits_misses_and_evictions():
+    cache = ChunkCache(max_entries=1)
+    cache.put((0, 0), _chunk(8))
+    assert cache.get((0, 0)) is not None
+    assert cache.get((5, 5)) is None
+    cache.put((1, 0), _chunk(8))
+    stats = cache.stats()
+    assert stats == {"entries": 1, "bytes": 8, "pinned": 0, "hits": 1, "misses": 1,
+                     "evictions": 1, "hit_rate": 0.5}
+
+
+def test_unbounded_cache_keeps_everything():
+    cache = ChunkCache()
+    for x in range(50):
+        cache.put((x, 0), _chunk(1000))
+    assert len(cache) == 50 and cache.evictions == 0
@@ -0,0 +1,28 @@
+import numpy as np
+
+from config import CHUNK_SIZE
+from map_2d_generator import compact_chunk, expand_chunk, is_uniform_chunk
+
+
+def test_uniform_chunk_collapses_to_scalar():
+    chunk = compact_chunk(np.full((CHUNK_SIZE, CHUNK_SIZE), 4))
+    assert is_uniform_chunk(chunk) and chunk == 4 and chunk.dtype == np.uint8
+    assert expand_chunk(chunk)[10, 200] == 4
+
+
+def test_mixed_chunk_is_stored_as_uint8_array():
+    tiles = np.zeros((CHUNK_SIZE, CHUNK_SIZE), dtype=np.int64)
+    tiles[3, 5] = 6
+    chunk = compact_chunk(tiles)
+    assert not is_uniform_chunk(chunk)
+    assert chunk.dtype == np.uint8 and chunk.shape == (CHUNK_SIZE, CHUNK_SIZE)
+    assert chunk[3, 5] == 6 and chunk[5, 3] == 0
+
+
+def test_expand_round_trip():
+    expanded = expand_chunk(compact_chunk(np.full((CHUNK_SIZE, CHUNK_SIZE), 2)))
+    assert expanded.shape == (CHUNK_SIZE, CHUNK_SIZE) and expanded.dtype == np.uint8
+    assert (expanded == 2).all()
+
+    tiles = np.random.default_rng(1).integers(0, 7, size=(CHUNK_SIZE, CHUNK_SIZE))
+    np.testing.assert_array_equal(expand_chunk(compact_chunk(tiles)), tiles)
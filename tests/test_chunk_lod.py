@@ -0,0 +1,48 @@
+import numpy as np
+
+from config import CHUNK_SIZE
+from map_2d_generator import build_chunk_lod, compact_chunk, downsample_tile_types
+
+
+def test_levels_halve_down_to_one_tile():
+    levels = build_chunk_lod(np.zeros((CHUNK_SIZE, CHUNK_SIZE), dtype=np.uint8))
+    assert [level.shape[0] for level in levels] == [CHUNK_SIZE >> k for k in range(len(levels))]
+    assert levels[-1].shape == (1, 1)
+    assert all(level.dtype == np.uint8 for level in levels)
+
+
+def test_each_level_is_the_mode_of_its_block():
+    rng = np.random.default_rng(3)
+    tiles = rng.integers(0, 7, size=(CHUNK_SIZE, CHUNK_SIZE)).astype(np.uint8)
+    levels = build_chunk_lod(tiles)
+    for k in (1, 3, 5):
+        block = 1 << k
+        for x, y in [(0, 0), (7, 2), (CHUNK_SIZE // block - 1, CHUNK_SIZE // block - 1)]:
+            counts = np.bincount(tiles[x * block:(x + 1) * block, y * block:(y + 1) * block].ravel(), minlength=7)
+            # 并列时取编号最小的瓦片类型
+            assert levels[k][x, y] == counts.argmax()
+
+
+def test_dominant_tile_type_survives_to_the_top():
+    tiles = np.full((CHUNK_SIZE, CHUNK_SIZE), 1, dtype=np.uint8)
+    tiles[:100, :100] = 0
+    assert build_chunk_lod(tiles)[-1][0, 0] == 1
+
+
+def test_uniform_chunk_is_expanded():
+    levels = build_chunk_lod(compact_chunk(np.full((CHUNK_SIZE, CHUNK_SIZE), 5)))
+    assert (levels[2] == 5).all() and levels[0].shape == (CHUNK_SIZE, CHUNK_SIZE)
+    # 整个区块的计数（CHUNK_SIZE^2）不会溢出
+    assert levels[-1][0, 0] == 5
+
+
+def test_downsample_matches_first_lod_level():
+    tiles = np.random.default_rng(4).integers(0, 7, size=(CHUNK_SIZE, CHUNK_SIZE)).astype(np.uint8)
+    np.testing.assert_array_equal(downsample_tile_types(tiles), build_chunk_lod(tiles)[1])
+
+
+def test_downsample_counts_extra_types():
+    # 导出工具把区域外的背景作为第 8 种类型参与众数
+    tiles = np.array([[7, 7, 0, 1],
+                      [7, 2, 1, 0]], dtype=np.uint8).T
+    np.testing.assert_array_equal(downsample_tile_types(tiles, 8), [[7], [0]])
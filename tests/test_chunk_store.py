@@ -0,0 +1,103 @@
+import os
+
+import numpy as np
+import pytest
+
+from chunk_store import HEADER_BYTES, ChunkStore
+from config import CHUNK_SIZE
+
+
+def _tiles(seed):
+    return np.random.default_rng(seed).integers(0, 7, size=(CHUNK_SIZE, CHUNK_SIZE), dtype=np.uint8)
+
+
+def test_round_trip_through_region_files(tmp_path):
+    store = ChunkStore(str(tmp_path), "key")
+    chunks = {(0, 0): _tiles(0), (-1, 5): _tiles(1), (17, -33): np.uint8(3)}
+    for chunk_key, chunk_data in chunks.items():
+        store.save(*chunk_key, chunk_data)
+    # 写入完成之前从待写入队列读取
+    assert store.load(0, 0) is chunks[(0, 0)]
+    store.close()
+
+    reopened = ChunkStore(str(tmp_path), "key")
+    for chunk_key, chunk_data in chunks.items():
+        loaded = reopened.load(*chunk_key)
+        np.testing.assert_array_equal(loaded, chunk_data)
+    assert np.ndim(reopened.load(17, -33)) == 0
+    assert reopened.load(1, 1) is None
+    reopened.close()
+
+
+def test_store_keys_are_separate(tmp_path):
+    store = ChunkStore(str(tmp_path), "a")
+    store.save(0, 0, _tiles(2))
+    store.close()
+    other = ChunkStore(str(tmp_path), "b")
+    assert other.load(0, 0) is None
+    other.close()
+
+
+def test_failed_write_is_dropped_and_writer_keeps_running(tmp_path, monkeypatch):
+    store = ChunkStore(str(tmp_path), "key")
+    original_write = ChunkStore._write_chunk
+
+    def write_chunk(self, region_files, chunk_key, chunk_data):
+        if chunk_key == (0, 0):
+            raise OSError(28, "No space left on device")
+        original_write(self, region_files, chunk_key, chunk_data)
+
+    monkeypatch.setattr(ChunkStore, "_write_chunk", write_chunk)
+    store.save(0, 0, _tiles(3))
+    store.save(1, 0, _tiles(4))
+    store.close()
+
+    assert store.failed_writes == 1
+    assert store._pending_writes == {}
+    assert store.load(0, 0) is None
+    np.testing.assert_array_equal(store.load(1, 0), _tiles(4))
+
+
+def test_loaded_chunks_do_not_hold_file_descriptors(tmp_path):
+    resource = pytest.importorskip("resource")
+    if not os.path.isdir("/proc/self/fd"):
+        pytest.skip("需要 /proc/self/fd 统计打开的文件数")
+
+    chunk_count = 64
+    store = ChunkStore(str(tmp_path), "key")
+    for chunk_x in range(chunk_count):
+        store.save(chunk_x, 0, _tiles(chunk_x))
+    store.close()
+
+    reopened = ChunkStore(str(tmp_path), "key")
+    soft_limit, hard_limit = resource.getrlimit(resource.RLIMIT_NOFILE)
+    # 只留出少量空余的文件描述符，远少于要同时持有的区块数
+    resource.setrlimit(resource.RLIMIT_NOFILE, (len(os.listdir("/proc/self/fd")) + 8, hard_limit))
+    try:
+        loaded = [reopened.load(chunk_x, 0) for chunk_x in range(chunk_count)]
+    finally:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (soft_limit, hard_limit))
+        reopened.close()
+
+    for chunk_x, chunk_data in enumerate(loaded):
+        np.testing.assert_array_equal(chunk_data, _tiles(chunk_x))
+
+
+def test_old_store_keys_are_pruned_over_budget(tmp_path):
+    for age, key in enumerate(["newest", "middle", "oldest"]):
+        store = ChunkStore(str(tmp_path), key)
+        store.save(0, 0, _tiles(age))
+        store.close()
+        mtime = 1_000_000 - age * 1000
+        os.utime(tmp_path / key, (mtime, mtime))
+    key_bytes = HEADER_BYTES + CHUNK_SIZE * CHUNK_SIZE
+
+    # 预算只够两个键：当前打开的键（即使最旧也保留）加上最近使用的 newest
+    current = ChunkStore(str(tmp_path), "oldest", max_bytes=2 * key_bytes)
+    current.close()
+    assert sorted(os.listdir(tmp_path)) == ["newest", "oldest"]
+    np.testing.assert_array_equal(current.load(0, 0), _tiles(2))
+
+    unlimited = ChunkStore(str(tmp_path), "other")
+    unlimited.close()
+    assert sorted(os.listdir(tmp_path)) == ["newest", "oldest", "other"]
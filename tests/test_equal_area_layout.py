@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from planet_generator import EqualAreaLayout, PlanetGenerator, get_grid_lat_lon
+
+
+@pytest.fixture(params=[24, 150])
+def layout(request):
+    return EqualAreaLayout(request.param)
+
+
+def test_rings_follow_the_latitude_circumference(layout):
+    lats, _ = get_grid_lat_lon(layout.resolution)
+    assert layout.ring_sizes[len(lats) // 2] >= layout.resolution - 2
+    assert layout.ring_sizes[0] == layout.ring_sizes[-1] == 1
+    assert layout.sample_count == layout.ring_sizes.sum() < layout.resolution ** 2
+    np.testing.assert_array_equal(np.bincount(layout.sample_rows), layout.ring_sizes)
+
+
+def test_every_sample_round_trips_through_its_tile(layout):
+    # 采样点的经度吸附到瓦片列后，该瓦片映射回同一个采样点
+    samples = np.arange(layout.sample_count)
+    rows = layout.sample_rows
+    cols = layout.snap_lons_to_cols(rows, layout.sample_lons.astype(np.float32))
+    np.testing.assert_array_equal(layout.tiles_to_samples(rows, cols), samples)
+
+
+def test_lookups_stay_on_the_tile_row(layout):
+    tile_samples = layout.get_tile_sample_map()
+    assert tile_samples.shape == (layout.resolution, layout.resolution)
+    rows = np.arange(layout.resolution)[:, None]
+    np.testing.assert_array_equal(layout.sample_rows[tile_samples], np.broadcast_to(rows, tile_samples.shape))
+    # 经度 ±π 是同一个位置
+    rows = np.arange(layout.resolution)
+    np.testing.assert_array_equal(
+        layout.lons_to_samples(rows, np.full(len(rows), np.pi, dtype=np.float32)),
+        layout.lons_to_samples(rows, np.full(len(rows), -np.pi, dtype=np.float32)))
+
+
+def test_subsample_selects_every_stride_th_sample(layout):
+    indices = layout.subsample(3)
+    assert set(layout.sample_rows[indices]) == set(range(0, layout.resolution, 3))
+    assert len(np.unique(indices)) == len(indices)
+    np.testing.assert_array_equal(layout.subsample(1), np.arange(layout.sample_count))
+
+
+def test_equal_area_requires_vectorized_generation():
+    with pytest.raises(ValueError):
+        PlanetGenerator(resolution=24, seed=1, vectorized=False, sampling="equal_area")
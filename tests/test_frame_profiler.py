@@ -0,0 +1,85 @@
+import csv
+
+import numpy as np
+import pytest
+
+import frame_profiler
+from frame_profiler import FrameProfiler
+
+
+class _FakeClock:
+    """代替 time.perf_counter 的手动时钟（秒）"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _FakeClock()
+    monkeypatch.setattr(frame_profiler.time, "perf_counter", clock)
+    return clock
+
+
+def _run_frame(profiler, clock, phases):
+    """按顺序执行各阶段，phases 为 [(阶段名, 耗时 ms)]"""
+    profiler.begin_frame()
+    for name, elapsed_ms in phases:
+        with profiler.phase(name):
+            clock.now += elapsed_ms / 1000
+    profiler.end_frame()
+
+
+def test_percentiles_over_rolling_window(clock):
+    profiler = FrameProfiler(window=100, history=200, enabled=True)
+    for elapsed in range(1, 301):
+        _run_frame(profiler, clock, [("draw", float(elapsed))])
+    # 只统计最近 100 帧：201..300 ms
+    p50, p95, p99 = profiler.percentiles("draw")
+    expected = np.percentile(np.arange(201, 301), (50, 95, 99))
+    assert (p50, p95, p99) == pytest.approx(tuple(expected))
+    assert profiler.percentiles("missing") is None
+
+
+def test_nested_phases_and_absent_frames(clock):
+    profiler = FrameProfiler(window=10, history=10, enabled=True)
+    profiler.begin_frame()
+    with profiler.phase("draw"):
+        with profiler.phase("map"):
+            clock.now += 0.004
+        clock.now += 0.001
+    profiler.end_frame()
+    _run_frame(profiler, clock, [("input", 2.0)])
+
+    names = [row[0] for row in profiler.summary()]
+    assert names == ["draw", "draw/map", "frame", "input"]
+    # 没有该阶段的帧不计入百分位
+    assert profiler.percentiles("draw/map")[0] == pytest.approx(4.0)
+    assert profiler.percentiles("draw")[0] == pytest.approx(5.0)
+
+    # 超出窗口后不再显示
+    for _ in range(10):
+        _run_frame(profiler, clock, [("input", 1.0)])
+    assert [row[0] for row in profiler.summary()] == ["frame", "input"]
+
+
+def test_export_keeps_only_the_ring_buffer(clock, tmp_path):
+    profiler = FrameProfiler(window=5, history=5, enabled=True)
+    for i in range(8):
+        _run_frame(profiler, clock, [("draw", 1.0)] + ([("chunks", 2.0)] if i == 7 else []))
+    path = tmp_path / "frames.csv"
+    assert profiler.export_csv(str(path)) == 5
+    with open(path, encoding="utf-8") as csv_file:
+        rows = list(csv.reader(csv_file))
+    assert rows[0] == ["frame", "chunks_ms", "draw_ms", "frame_ms"]
+    assert [row[0] for row in rows[1:]] == ["3", "4", "5", "6", "7"]
+    assert rows[1][1] == "0.000" and rows[-1][1] == "2.000"
+
+
+def test_disabled_profiler_records_nothing(clock):
+    profiler = FrameProfiler(enabled=False)
+    _run_frame(profiler, clock, [("draw", 1.0)])
+    assert profiler.frame_count == 0 and profiler.summary() == []
@@ -0,0 +1,89 @@
+import contextlib
+import io
+
+import numpy as np
+import pygame
+import pytest
+
+import frame_scheduler
+from frame_scheduler import FrameScheduler
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _FakeClock()
+    monkeypatch.setattr(frame_scheduler.time, "perf_counter", clock)
+    return clock
+
+
+def test_unchanged_frames_are_skipped(clock):
+    scheduler = FrameScheduler(tick_rate=60, render_fps=60, idle_throttling=True)
+    assert scheduler.should_render(True)
+    assert not scheduler.should_render(False)
+    assert (scheduler.rendered_frames, scheduler.skipped_frames) == (1, 1)
+
+
+def test_render_fps_coalesces_ticks(clock):
+    scheduler = FrameScheduler(tick_rate=60, render_fps=20, idle_throttling=True)
+    rendered = 0
+    for _ in range(120):
+        rendered += scheduler.should_render(True)
+        clock.now += 1 / 60
+    assert rendered == 40
+
+
+def test_equal_rates_tolerate_timer_jitter(clock):
+    scheduler = FrameScheduler(tick_rate=60, render_fps=60, idle_throttling=True)
+    jitter = np.random.default_rng(0).uniform(-0.002, 0.002, size=120)
+    for offset in jitter:
+        assert scheduler.should_render(True)
+        clock.now += 1 / 60 + offset
+
+
+def test_without_throttling_every_frame_renders(clock):
+    scheduler = FrameScheduler(tick_rate=60, render_fps=60, idle_throttling=False)
+    for _ in range(5):
+        assert scheduler.should_render(False)
+        clock.now += 1 / 60
+
+
+def test_idle_scheduler_waits_for_wake_event():
+    pygame.init()
+    try:
+        scheduler = FrameScheduler(idle_throttling=True)
+        scheduler.should_render(False)
+        pygame.event.clear()
+        frame_scheduler.post_wake_event(None)
+        events = scheduler.get_events()
+        assert [event.type for event in events] == [frame_scheduler.WAKE_EVENT]
+        assert scheduler.idle_waits == 1
+    finally:
+        pygame.quit()
+
+
+def test_map_view_state_tracks_cache_statistics(small_planet):
+    from map_2d_generator import Map2DGenerator
+    from map_2d_scene import Map2DScene
+
+    generator = Map2DGenerator(small_planet, async_loading=False, chunk_store_dir=None)
+    with contextlib.redirect_stdout(io.StringIO()):
+        scene = Map2DScene(generator)
+        scene.start_new_map("GRASSLAND", (0, 0))
+    try:
+        scene.draw()
+        state = scene.get_view_state()
+        assert scene.get_view_state() == state
+        # 缓存统计显示在画面上，发生淘汰时需要重绘
+        generator.generated_chunks.evictions += 1
+        assert scene.get_view_state() != state
+    finally:
+        generator.shutdown()
+        pygame.quit()
@@ -0,0 +1,104 @@
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pytest
+
+from map_2d_generator import Map2DGenerator, build_chunk_lod, expand_chunk
+
+
+class _StubExecutor:
+    """记录提交的任务，不实际执行"""
+
+    def __init__(self):
+        self.submitted = []
+        self.shut_down = False
+
+    def submit(self, func, *args):
+        self.submitted.append(args)
+        return Future()
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+def _failed_future(error):
+    future = Future()
+    future.set_exception(error)
+    return future
+
+
+def _install(generator, replacements):
+    generator._executor = _StubExecutor()
+    replacements.append(generator._executor)
+    return generator._executor
+
+
+@pytest.fixture
+def generator(small_planet):
+    generator = Map2DGenerator(small_planet, async_loading=True, chunk_store_dir=None)
+    yield generator
+    generator.pending_chunks = {}
+    generator._executor = None
+
+
+def test_worker_error_falls_back_to_synchronous_generation(generator):
+    generator.pending_chunks[(1, 2)] = _failed_future(RuntimeError("worker failed"))
+    finished = generator.collect_finished_chunks()
+    np.testing.assert_array_equal(expand_chunk(finished[(1, 2)]), expand_chunk(generator.generate_chunk(1, 2)))
+    assert generator.pending_chunks == {}
+    assert generator.generated_chunks.get((1, 2)) is not None
+
+
+def test_broken_pool_is_restarted_and_other_chunks_resubmitted(generator, monkeypatch):
+    broken = _StubExecutor()
+    generator._executor = broken
+    generator.pending_chunks[(0, 0)] = _failed_future(BrokenProcessPool())
+    generator.pending_chunks[(0, 1)] = _failed_future(BrokenProcessPool())
+    replacements = []
+    monkeypatch.setattr(generator, "_get_executor", lambda: generator._executor or _install(generator, replacements))
+
+    finished = generator.collect_finished_chunks()
+
+    assert broken.shut_down
+    assert len(replacements) == 1 and replacements[0].submitted == [(0, 1)]
+    # 触发重建的区块同步生成，另一个区块等待新进程池的结果
+    assert list(finished) == [(0, 0)]
+    assert not generator.pending_chunks[(0, 1)].done()
+
+
+def test_request_chunk_returns_fallback_for_failed_prefetch(generator):
+    generator.pending_chunks[(3, 3)] = _failed_future(ValueError("bad"))
+    assert generator.request_chunk(3, 3) is not None
+    assert (3, 3) not in generator.pending_chunks
+
+
+def test_worker_built_lod_is_handed_to_the_scene_once(generator):
+    chunk_data = generator.generate_chunk(0, 0)
+    lod = build_chunk_lod(chunk_data)
+    future = Future()
+    future.set_result((chunk_data, lod[1:]))
+    generator.pending_chunks[(0, 0)] = future
+    generator.collect_finished_chunks()
+
+    taken = generator.take_chunk_lod((0, 0), chunk_data)
+    assert len(taken) == len(lod) and taken[0] is chunk_data
+    assert (0, 0) not in generator.chunk_lods
+    # 没有预先构建的 LOD 时当场构建
+    for expected, level in zip(lod, generator.take_chunk_lod((0, 0), chunk_data)):
+        np.testing.assert_array_equal(level, expected)
+
+
+def test_pinning_drops_untaken_lods_outside_the_window(generator):
+    generator.chunk_lods = {(0, 0): [], (9, 9): []}
+    generator.pin_chunks([(0, 0)])
+    assert list(generator.chunk_lods) == [(0, 0)]
+
+
+def test_seeds_256_apart_generate_different_worlds(small_planet):
+    fields = []
+    for seed in (5, 261):
+        generator = Map2DGenerator(small_planet, async_loading=False, chunk_store_dir=None)
+        generator.global_seed = seed
+        fields.append(generator._get_chunk_noise(0, 0, 0.01, 4))
+    assert not np.array_equal(fields[0], fields[1])
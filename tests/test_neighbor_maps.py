@@ -0,0 +1,51 @@
+import numpy as np
+
+from config import BIOME_IDS
+from map_2d_generator import build_neighbor_maps
+
+OCEAN = BIOME_IDS["OCEAN"]
+DEEP_OCEAN = BIOME_IDS["DEEP_OCEAN"]
+BEACH = BIOME_IDS["BEACH"]
+FOREST = BIOME_IDS["FOREST"]
+
+
+def _reference(biomes, biome_names):
+    """逐瓦片检查 8 邻域（行星外按草原处理）"""
+    ids = [BIOME_IDS[name] for name in biome_names]
+    rows, cols = biomes.shape
+    result = np.zeros((rows, cols), dtype=bool)
+    for x in range(rows):
+        for y in range(cols):
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    if not (dx or dy):
+                        continue
+                    nx, ny = x + dx, y + dy
+                    neighbor = biomes[nx, ny] if 0 <= nx < rows and 0 <= ny < cols else BIOME_IDS["GRASSLAND"]
+                    result[x, y] |= neighbor in ids
+    return result
+
+
+def test_matches_per_tile_neighbor_scan():
+    biomes = np.random.default_rng(5).integers(0, len(BIOME_IDS), size=(9, 11)).astype(np.uint8)
+    has_ocean, has_land = build_neighbor_maps(biomes)
+    np.testing.assert_array_equal(has_ocean, _reference(biomes, ["OCEAN", "DEEP_OCEAN"]))
+    np.testing.assert_array_equal(has_land, _reference(
+        biomes, ["GRASSLAND", "FOREST", "DESERT", "SNOW", "MOUNTAIN"]))
+
+
+def test_tile_itself_and_beaches_do_not_count():
+    biomes = np.full((3, 3), BEACH, dtype=np.uint8)
+    biomes[1, 1] = OCEAN
+    has_ocean, has_land = build_neighbor_maps(biomes)
+    assert not has_ocean[1, 1]
+    assert has_ocean[0, 0] and has_ocean[2, 2]
+    # 中心瓦片的邻居都是海滩，不算陆地
+    assert not has_land[1, 1]
+
+
+def test_outside_of_the_planet_counts_as_land():
+    biomes = np.full((4, 4), DEEP_OCEAN, dtype=np.uint8)
+    _, has_land = build_neighbor_maps(biomes)
+    assert has_land[0, 2] and has_land[3, 3]
+    assert not has_land[1, 1] and not has_land[2, 2]
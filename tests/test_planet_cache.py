@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+import pytest
+
+from planet_generator import PlanetGenerator
+
+
+def _planet(resolution=24, seed=7):
+    return PlanetGenerator(resolution=resolution, seed=seed, vectorized=True, sampling="grid")
+
+
+def _cache_path(cache_dir, planet):
+    return os.path.join(cache_dir, planet._get_cache_key())
+
+
+def test_cache_round_trip(tmp_path, small_planet):
+    planet = _planet()
+    planet.load_or_generate(str(tmp_path))
+
+    cached = _planet()
+    assert cached._load_cache(_cache_path(str(tmp_path), cached))
+    assert isinstance(cached.points, np.memmap)
+    np.testing.assert_array_equal(cached.points, small_planet.points)
+    np.testing.assert_array_equal(cached.biomes, small_planet.biomes)
+
+
+def test_shape_mismatch_falls_back_to_generation(tmp_path, small_planet):
+    small = _planet(resolution=16)
+    small.generate()
+    # 把分辨率 16 的数据放在分辨率 24 的缓存键下
+    small._save_cache(_cache_path(str(tmp_path), _planet()))
+
+    planet = _planet()
+    assert not planet._load_cache(_cache_path(str(tmp_path), planet))
+    planet.load_or_generate(str(tmp_path))
+    np.testing.assert_array_equal(planet.biomes, small_planet.biomes)
+
+    # 重新生成后覆盖了错误的缓存
+    assert _planet()._load_cache(_cache_path(str(tmp_path), planet))
+
+
+@pytest.mark.parametrize("damage", ["truncate", "garbage", "missing"])
+def test_damaged_cache_falls_back_to_generation(tmp_path, small_planet, damage):
+    _planet().load_or_generate(str(tmp_path))
+    points_path = os.path.join(_cache_path(str(tmp_path), _planet()), "points.npy")
+    if damage == "truncate":
+        with open(points_path, "r+b") as points_file:
+            points_file.truncate(os.path.getsize(points_path) // 2)
+    elif damage == "garbage":
+        with open(points_path, "wb") as points_file:
+            points_file.write(b"not a numpy file" * 8)
+    else:
+        os.remove(points_path)
+
+    planet = _planet()
+    assert not planet._load_cache(_cache_path(str(tmp_path), planet))
+    planet.load_or_generate(str(tmp_path))
+    np.testing.assert_array_equal(planet.points, small_planet.points)
+    np.testing.assert_array_equal(planet.biomes, small_planet.biomes)
+
+
+def test_old_planets_are_pruned_over_budget(tmp_path):
+    for age, seed in enumerate([1, 2, 3]):
+        planet = _planet(seed=seed)
+        planet.load_or_generate(str(tmp_path), max_cache_bytes=None)
+        mtime = 1_000_000 - age * 1000
+        os.utime(_cache_path(str(tmp_path), planet), (mtime, mtime))
+    planet_bytes = sum(entry.stat().st_size for entry in os.scandir(_cache_path(str(tmp_path), _planet(seed=1))))
+
+    # 预算只够两个行星：新生成的加上最近使用的 seed 1
+    planet = _planet(seed=4)
+    planet.load_or_generate(str(tmp_path), max_cache_bytes=2 * planet_bytes)
+    assert sorted(os.listdir(tmp_path)) == sorted(_planet(seed=seed)._get_cache_key() for seed in (1, 4))
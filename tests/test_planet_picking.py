@@ -0,0 +1,99 @@
+import math
+
+import numpy as np
+import pygame
+import pytest
+
+from config import SCREEN_HEIGHT, SCREEN_WIDTH
+
+# 点击位置在屏幕上的圆盘半径（与 Visualizer._get_tile_at 一致）
+DISC_RADIUS = SCREEN_WIDTH * 0.4
+
+
+@pytest.fixture(scope="module", params=["grid", "equal_area"])
+def visualizer(request, small_planet):
+    from planet_generator import PlanetGenerator
+    from visualizer import Visualizer
+
+    if request.param == "grid":
+        planet = small_planet
+    else:
+        planet = PlanetGenerator(resolution=24, seed=7, sampling="equal_area")
+        planet.generate()
+    yield Visualizer(planet)
+    pygame.quit()
+
+
+def _lat_lon_points(lats, lons):
+    lats, lons = np.broadcast_arrays(np.asarray(lats, dtype=float), np.asarray(lons, dtype=float))
+    return np.stack([np.cos(lats) * np.cos(lons), np.cos(lats) * np.sin(lons), np.sin(lats)])
+
+
+def _assert_same_point(visualizer, tile, expected_tile):
+    # 网格两端的列（经度 ±π）以及极点所在行的各列是球面上的同一个点
+    np.testing.assert_allclose(visualizer.planet.get_tile_point(*tile),
+                               visualizer.planet.get_tile_point(*expected_tile), atol=1e-6)
+
+
+@pytest.mark.parametrize("angle_x", [math.pi / 3, math.pi / 2, math.pi * 2 / 3])
+@pytest.mark.parametrize("angle_y", [-math.pi, -2.0, -0.5, 0.0, 1.0, 2.5, math.pi])
+def test_projected_tiles_are_picked_back(visualizer, angle_x, angle_y):
+    visualizer.angle_x, visualizer.angle_y = angle_x, angle_y
+    rotation = visualizer._get_rotation_matrix()
+    resolution = visualizer.planet.resolution
+
+    picked_count = 0
+    for row in range(resolution):
+        for col in range(resolution):
+            rotated = rotation @ visualizer.planet.get_tile_point(row, col).astype(float)
+            if rotated[2] < 0.05:
+                # 背面或贴近圆盘边缘的瓦片看不到
+                continue
+            tile = visualizer._find_closest_planet_tile(rotated[0], rotated[1])
+            _assert_same_point(visualizer, tile, (row, col))
+            picked_count += 1
+    assert picked_count > resolution * resolution // 4
+
+
+def test_pick_through_screen_coordinates(visualizer):
+    visualizer.angle_x, visualizer.angle_y = math.pi / 2, 0.0
+    rotation = visualizer._get_rotation_matrix()
+    resolution = visualizer.planet.resolution
+    # 取一个既不在圆盘中心也不贴近边缘的可见瓦片
+    depths = np.array([[(rotation @ visualizer.planet.get_tile_point(row, col))[2] for col in range(resolution)]
+                       for row in range(resolution)])
+    row, col = np.unravel_index(np.argmin(np.abs(depths - 0.6)), depths.shape)
+    rotated = rotation @ visualizer.planet.get_tile_point(row, col).astype(float)
+    mouse_x = SCREEN_WIDTH // 2 + rotated[0] * DISC_RADIUS
+    mouse_y = SCREEN_HEIGHT // 2 + rotated[1] * DISC_RADIUS
+    _assert_same_point(visualizer, visualizer._get_tile_at(mouse_x, mouse_y), (row, col))
+
+
+def test_longitudes_near_the_seam(visualizer):
+    resolution = visualizer.planet.resolution
+    lats = np.linspace(-1.2, 1.2, 7)
+    for lon in (math.pi - 1e-9, -math.pi + 1e-9, math.pi, -math.pi):
+        rows, cols = visualizer._points_to_tiles(_lat_lon_points(lats, lon))
+        assert np.all((cols == 0) | (cols == resolution - 1))
+        for row, col in zip(rows, cols):
+            # 经度 ±π 附近的点落在接缝处的瓦片上（两端的列是同一条经线）
+            point = visualizer.planet.get_tile_point(row, col)
+            assert abs(math.atan2(point[1], point[0])) > math.pi - 0.3
+
+
+def test_points_near_the_poles(visualizer):
+    resolution = visualizer.planet.resolution
+    lons = np.linspace(-math.pi, math.pi, 13)
+    for lat, pole_row in ((math.pi / 2 - 1e-6, resolution - 1), (-math.pi / 2 + 1e-6, 0)):
+        rows, cols = visualizer._points_to_tiles(_lat_lon_points(lat, lons))
+        assert np.all(rows == pole_row)
+        assert np.all((cols >= 0) & (cols < resolution))
+        for row, col in zip(rows, cols):
+            assert abs(visualizer.planet.get_tile_point(row, col)[2]) > 0.999
+
+
+@pytest.mark.parametrize("mouse", [(0, 0), (SCREEN_WIDTH - 1, SCREEN_HEIGHT - 1),
+                                   (SCREEN_WIDTH // 2 + DISC_RADIUS * 1.01, SCREEN_HEIGHT // 2),
+                                   (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - DISC_RADIUS * 1.01)])
+def test_click_off_the_disc_returns_none(visualizer, mouse):
+    assert visualizer._get_tile_at(*mouse) is None
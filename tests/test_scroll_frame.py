@@ -0,0 +1,69 @@
+import contextlib
+import io
+
+import numpy as np
+import pygame
+import pytest
+
+from config import SCREEN_HEIGHT, SCREEN_WIDTH
+
+
+@pytest.fixture(scope="module")
+def scene(small_planet):
+    from map_2d_generator import Map2DGenerator
+    from map_2d_scene import Map2DScene
+
+    generator = Map2DGenerator(small_planet, async_loading=False, chunk_store_dir=None)
+    with contextlib.redirect_stdout(io.StringIO()):
+        scene = Map2DScene(generator)
+        scene.start_new_map("GRASSLAND", (0, 0))
+    yield scene
+    generator.shutdown()
+    pygame.quit()
+
+
+def _center_on_coast(scene):
+    """把摄像机移到已加载区块中的瓦片类型边界上，让画面里有多种瓦片"""
+    from config import CHUNK_SIZE
+    from map_2d_generator import is_uniform_chunk
+
+    for (chunk_x, chunk_y), chunk_data in sorted(scene.loaded_chunks.items()):
+        if chunk_data is None or is_uniform_chunk(chunk_data):
+            continue
+        tile_x, tile_y = np.argwhere(np.diff(chunk_data.astype(np.int16), axis=0) != 0)[0]
+        scene.camera_x = chunk_x * CHUNK_SIZE + tile_x + 0.5
+        scene.camera_y = chunk_y * CHUNK_SIZE + tile_y + 0.5
+        return
+    pytest.fail("没有包含多种瓦片的区块")
+
+
+def _full_redraw(scene):
+    scene.frame_dirty = True
+    scene.draw()
+    return pygame.surfarray.array2d(scene.viewport_surface)
+
+
+# 每一步的摄像机位移（瓦片）：不足一个瓦片、多个瓦片，两个轴的正负方向以及同时移动
+PAN_STEPS = [(0.3, 0.0), (0.0, 0.45), (-0.7, -0.2), (3.0, 0.0), (0.0, -5.25),
+             (-4.6, 2.3), (7.1, 6.9), (-0.05, 0.05)]
+
+
+@pytest.mark.parametrize("tiles_on_screen", [50, 100, 1024])
+def test_scrolled_frames_match_full_redraw(scene, tiles_on_screen, monkeypatch):
+    scrolls = []
+    scroll_frame = scene._scroll_frame
+    monkeypatch.setattr(scene, "_scroll_frame", lambda *args: (scrolls.append(args), scroll_frame(*args)))
+
+    _center_on_coast(scene)
+    scene.tiles_on_screen = tiles_on_screen
+    assert len(np.unique(_full_redraw(scene))) > 1
+    for step, (dx, dy) in enumerate(PAN_STEPS):
+        scene.camera_x += dx
+        scene.camera_y += dy
+        scene.draw()
+        assert len(scrolls) == step + 1
+        scrolled = pygame.surfarray.array2d(scene.viewport_surface)
+        np.testing.assert_array_equal(scrolled, _full_redraw(scene),
+                                      err_msg=f"step {step}: pan ({dx}, {dy}) tiles")
+
+    assert scrolled.shape == (SCREEN_WIDTH, SCREEN_HEIGHT)
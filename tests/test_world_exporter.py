@@ -0,0 +1,62 @@
+import os
+
+import numpy as np
+import pytest
+
+from world_exporter import WorldExporter, _load_tile
+
+
+@pytest.fixture
+def exporter(small_planet, tmp_path):
+    exporter = WorldExporter(small_planet, str(tmp_path), origin_x=-1, origin_y=0, width=3, height=2, workers=1)
+    assert exporter.check_manifest()
+    return exporter
+
+
+def _tile_paths(output_dir):
+    return sorted(os.path.relpath(os.path.join(directory, name), output_dir)
+                  for directory, _, names in os.walk(output_dir) for name in names if name.endswith(".png"))
+
+
+def test_exports_every_zoom_level(exporter, tmp_path):
+    stats = exporter.run()
+    assert exporter.max_zoom == 2
+    assert stats["generated"] == 6 and stats["skipped"] == 0
+    # z1: 2x1 张，z0: 1 张
+    assert stats["pyramid_tiles"] == 3
+    assert len(_tile_paths(str(tmp_path))) == 9
+
+
+def test_rerun_skips_finished_tiles(exporter):
+    exporter.run()
+    stats = exporter.run()
+    assert (stats["generated"], stats["skipped"], stats["pyramid_tiles"]) == (0, 6, 0)
+
+
+def test_deleted_tile_is_regenerated_with_its_ancestors(exporter):
+    exporter.run()
+    parent = _load_tile(exporter.tile_path(1, 0, 0))
+    root = _load_tile(exporter.tile_path(0, 0, 0))
+    untouched_mtime = os.stat(exporter.tile_path(1, 1, 0)).st_mtime_ns
+    os.remove(exporter.tile_path(2, 0, 0))
+
+    stats = exporter.run()
+
+    assert stats["generated"] == 1 and stats["skipped"] == 5
+    # 只重建 1/0/0 和 0/0/0，另一张 z1 瓦片保持不变
+    assert stats["pyramid_tiles"] == 2
+    assert os.stat(exporter.tile_path(1, 1, 0)).st_mtime_ns == untouched_mtime
+    np.testing.assert_array_equal(_load_tile(exporter.tile_path(1, 0, 0)), parent)
+    np.testing.assert_array_equal(_load_tile(exporter.tile_path(0, 0, 0)), root)
+
+
+def test_stale_ancestor_left_by_an_interrupted_run_is_rebuilt(exporter):
+    exporter.run()
+    # 模拟上次运行在重建 z1 之后、重建 z0 之前中断：z0 比它的子瓦片旧
+    root_path = exporter.tile_path(0, 0, 0)
+    child_mtime = os.stat(exporter.tile_path(1, 0, 0)).st_mtime_ns
+    os.utime(root_path, ns=(child_mtime - 10 ** 9, child_mtime - 10 ** 9))
+
+    stats = exporter.run()
+    assert stats["generated"] == 0 and stats["pyramid_tiles"] == 1
+    assert os.stat(root_path).st_mtime_ns > child_mtime - 10 ** 9